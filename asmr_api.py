@@ -8,13 +8,70 @@ ASMR.ONE API 客户端
     async with AsmrApi() as api:
         works = await api.get_works()
         results = await api.search("治愈")
+
+长生命周期用法（应用内共享一个连接池）:
+    api = await AsmrApi().start()
+    ...
+    await api.aclose()
+
+脚本中的同步用法（后台线程常驻事件循环，支持批量并发）:
+    with SyncAsmrApi() as api:
+        pages = api.get_works_many(range(1, 11))
+
+GET 请求按接口区分连接/读取超时，遇到超时、连接错误和 429/5xx 时
+按指数退避（带抖动）重试，并遵守 Retry-After；所有请求经令牌桶限速。
+每个接口单独熔断：连续失败（重试用尽才算一次）后熔断一段时间，
+期间有本地缓存的接口直接返回缓存。
+每次请求的耗时、字节数、状态码、重试次数和缓存命中都记入 metrics。
+
+作品和音轨以 services.models 中的 Work / Track 对象返回，只保留用到的字段。
+
+大列表接口另有流式版本（iter_tags / iter_vas / iter_circles / iter_tracks），
+边下载边解析，逐条产出记录:
+    async for tag in api.iter_tags():
+        ...
 """
 
+import asyncio
+import atexit
+import contextlib
+import os
+import threading
+import time
 import httpx
 from dataclasses import dataclass, field
-from typing import Optional
-
-BASE_URL = "https://api.asmr-200.com/api"
+from typing import Any, AsyncIterator, Iterable, Optional
+
+from services.json_stream import JsonArrayStream
+from services.metrics import Metrics
+from services.models import Track, Work
+from services.ratelimit import TokenBucket
+from services.resilience import (
+    RETRY_STATUSES, BreakerGroup, CircuitOpenError, RetryPolicy, is_backend_failure,
+    retry_after,
+)
+from services.response_cache import ResponseCache, CacheEntry, cache_key
+from services.single_flight import SingleFlight
+from services.search_index import SearchIndex
+
+try:
+    import h2  # noqa: F401  httpx 的 HTTP/2 支持依赖 h2
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+# 可用环境变量指向其他服务器（如 bench/ 中的本地假服务器）
+BASE_URL = os.environ.get("ASMR_API_BASE_URL", "https://api.asmr-200.com/api")
+
+# 按接口划分的超时；未列出的接口用 DEFAULT_TIMEOUT
+DEFAULT_TIMEOUT = httpx.Timeout(connect=5.0, read=15.0, write=10.0, pool=10.0)
+ENDPOINT_TIMEOUTS = {
+    # 完整字典体积大，读取时间放宽
+    "tags": httpx.Timeout(connect=5.0, read=60.0, write=10.0, pool=10.0),
+    "vas": httpx.Timeout(connect=5.0, read=60.0, write=10.0, pool=10.0),
+    "circles": httpx.Timeout(connect=5.0, read=60.0, write=10.0, pool=10.0),
+    "cover": httpx.Timeout(connect=5.0, read=20.0, write=10.0, pool=10.0),
+}
 
 
 @dataclass
@@ -24,19 +81,72 @@ class AsmrApi:
     username: Optional[str] = None
     password: Optional[str] = None
     token: Optional[str] = field(default=None, repr=False)
+    base_url: str = BASE_URL
+
+    # 连接池参数
+    http2: bool = True
+    max_connections: int = 10
+    max_keepalive_connections: int = 5
+    keepalive_expiry: float = 60.0
+
+    # 容错参数
+    rate: float = 8.0  # 每秒最多请求数
+    cover_rate: float = 20.0  # 封面单独限速，不占用 API 的令牌
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+    breakers: BreakerGroup = field(default_factory=BreakerGroup, repr=False)
+
+    # 本地响应缓存（可选）
+    cache: Optional[ResponseCache] = field(default=None, repr=False)
+    # 本地全文索引（可选），返回的作品会自动写入
+    index: Optional[SearchIndex] = field(default=None, repr=False)
+    # 请求统计
+    metrics: Metrics = field(default_factory=Metrics, repr=False)
+
     _client: Optional[httpx.AsyncClient] = field(default=None, repr=False, init=False)
+    _bg_tasks: set = field(default_factory=set, repr=False, init=False)
+    _inflight: SingleFlight = field(default_factory=SingleFlight, repr=False, init=False)
+    _bucket: Optional[TokenBucket] = field(default=None, repr=False, init=False)
+    _cover_bucket: Optional[TokenBucket] = field(default=None, repr=False, init=False)
 
     async def __aenter__(self):
-        self._client = httpx.AsyncClient(
-            base_url=BASE_URL,
-            timeout=30.0,
-            headers={"User-Agent": "AsmrApi/1.0"},
-        )
-        return self
+        return await self.start()
 
     async def __aexit__(self, *exc):
-        if self._client:
-            await self._client.aclose()
+        await self.aclose()
+
+    # ── 会话生命周期 ──────────────────────────────────
+
+    async def start(self) -> "AsmrApi":
+        """创建底层连接池。重复调用不会新建连接。"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=DEFAULT_TIMEOUT,
+                headers={"User-Agent": "AsmrApi/1.0"},
+                http2=self.http2 and _HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+            )
+            self._bucket = TokenBucket(self.rate, capacity=self.rate * 2)
+            self._cover_bucket = TokenBucket(self.cover_rate, capacity=self.cover_rate * 2)
+        return self
+
+    async def aclose(self):
+        """关闭连接池，应用退出时调用。"""
+        for task in list(self._bg_tasks):
+            task.cancel()
+        self._bg_tasks.clear()
+        self._inflight.cancel_all()
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+
+    @property
+    def is_open(self) -> bool:
+        return self._client is not None and not self._client.is_closed
 
     @property
     def _headers(self) -> dict:
@@ -44,6 +154,236 @@ class AsmrApi:
             return {"Authorization": f"Bearer {self.token}"}
         return {}
 
+    # ── 请求与容错 ────────────────────────────────────
+
+    async def _request(self, endpoint: str, path: str, params: Optional[dict] = None,
+                       headers: Optional[dict] = None,
+                       bucket: Optional[TokenBucket] = None) -> httpx.Response:
+        """
+        发送 GET 请求（限速、超时、重试、熔断）。
+        返回最终响应，4xx 等不可重试的状态由调用方处理。
+        bucket 默认为 API 的令牌桶。
+        """
+        timeout = ENDPOINT_TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT)
+        breaker = self.breakers.get(endpoint)
+        started = time.perf_counter()
+        resp, status, attempt, probe = None, "error", 1, False
+        try:
+            for attempt in range(1, self.retry.attempts + 1):
+                # half-open 的试探请求重试时不再检查（其余请求此时会被拒绝）
+                probe = probe or breaker.allow()
+                await (bucket or self._bucket).acquire()
+                try:
+                    resp = await self._client.get(
+                        path, params=params, headers=headers, timeout=timeout
+                    )
+                except httpx.TransportError as e:
+                    resp, status = None, type(e).__name__
+                    if attempt == self.retry.attempts:
+                        raise
+                    delay = self.retry.delay(attempt)
+                else:
+                    status = resp.status_code
+                    if resp.status_code not in RETRY_STATUSES:
+                        breaker.record_success()
+                        return resp
+                    delay = retry_after(resp)
+                    if delay is None:
+                        delay = self.retry.delay(attempt)
+                    if attempt == self.retry.attempts or delay > self.retry.max_retry_after:
+                        resp.raise_for_status()
+                await asyncio.sleep(delay)
+        except CircuitOpenError:
+            status = "circuit_open"
+            raise
+        except httpx.HTTPError as e:
+            # 整个逻辑请求（含重试）失败才计一次，重试本身不计入熔断
+            if is_backend_failure(e):
+                breaker.record_failure()
+            raise
+        finally:
+            if probe:
+                breaker.release()
+            self.metrics.record_request(
+                endpoint, time.perf_counter() - started, status,
+                # 实际传输的字节数（压缩时小于解压后的 content）
+                resp.num_bytes_downloaded if resp is not None else 0, attempt - 1,
+            )
+
+    async def _stream_array(self, endpoint: str, path: str, params: Optional[dict] = None,
+                            body: Optional[bytearray] = None,
+                            cache_result: str = "bypass") -> AsyncIterator[Any]:
+        """
+        流式 GET 一个顶层为数组的 JSON 响应，逐个产出数组元素。
+        收到响应体之前的失败按 _request 的规则重试；开始产出元素后
+        不再重试（调用方已经拿到了部分数据），错误直接抛出。
+        传入 body 时把收到的响应体追加进去（供调用方写缓存）。
+        只切分顶层数组，元素内部（如文件夹的 children）整体解析后才产出。
+        调用方可能中途停止时用 contextlib.aclosing 包住，及时关闭连接并记录统计。
+        """
+        timeout = ENDPOINT_TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT)
+        breaker = self.breakers.get(endpoint)
+        started = time.perf_counter()
+        status, attempt, nbytes, probe = "error", 1, 0, False
+        try:
+            for attempt in range(1, self.retry.attempts + 1):
+                # half-open 的试探请求重试时不再检查（其余请求此时会被拒绝）
+                probe = probe or breaker.allow()
+                await self._bucket.acquire()
+                try:
+                    async with self._client.stream(
+                        "GET", path, params=params, headers=self._headers, timeout=timeout
+                    ) as resp:
+                        status = resp.status_code
+                        if resp.status_code in RETRY_STATUSES:
+                            delay = retry_after(resp)
+                            if delay is None:
+                                delay = self.retry.delay(attempt)
+                            if attempt == self.retry.attempts or delay > self.retry.max_retry_after:
+                                resp.raise_for_status()
+                        else:
+                            resp.raise_for_status()
+                            parser = JsonArrayStream()
+                            async for chunk in resp.aiter_bytes():
+                                nbytes = resp.num_bytes_downloaded
+                                if body is not None:
+                                    body += chunk
+                                for item in parser.feed(chunk):
+                                    yield item
+                            for item in parser.close():
+                                yield item
+                            breaker.record_success()
+                            return
+                except httpx.TransportError as e:
+                    status = type(e).__name__
+                    if attempt == self.retry.attempts or nbytes:
+                        raise
+                    delay = self.retry.delay(attempt)
+                await asyncio.sleep(delay)
+        except CircuitOpenError:
+            status = "circuit_open"
+            raise
+        except httpx.HTTPError as e:
+            # 整个逻辑请求（含重试）失败才计一次，重试本身不计入熔断
+            if is_backend_failure(e):
+                breaker.record_failure()
+            raise
+        finally:
+            if probe:
+                breaker.release()
+            self.metrics.record_request(
+                endpoint, time.perf_counter() - started, status, nbytes, attempt - 1,
+            )
+            self.metrics.record_cache(endpoint, cache_result)
+
+    # ── 请求与缓存 ────────────────────────────────────
+
+    async def _get_json(self, endpoint: str, path: str, params: Optional[dict] = None,
+                        use_cache: bool = True) -> Any:
+        """
+        GET 请求并解析 JSON。相同路径和参数的并发请求只发一次网络请求，
+        结果由所有调用方共享。use_cache=False 时绕过本地响应缓存。
+        """
+        return await self._inflight.run(
+            ("GET", cache_key(path, params), use_cache),
+            lambda: self._load_json(endpoint, path, params, use_cache),
+        )
+
+    async def _load_json(self, endpoint: str, path: str, params: Optional[dict] = None,
+                         use_cache: bool = True) -> Any:
+        """
+        按 endpoint 的缓存策略读写本地缓存并请求网络。
+
+        - 新鲜期内：直接返回缓存
+        - 过期但仍在 stale 期内：返回缓存，同时后台重新验证
+        - 无缓存或已彻底过期：请求网络（带条件请求头）
+        - 网络失败或熔断中：有缓存（不论多旧）就返回缓存
+
+        每次查找只记一种缓存结果：hit / stale / miss / not_modified / fallback。
+        """
+        policy = self.cache.policy(endpoint) if self.cache and use_cache else None
+        if policy is None:
+            self.metrics.record_cache(endpoint, "bypass")
+            resp = await self._request(endpoint, path, params, self._headers)
+            resp.raise_for_status()
+            return resp.json()
+
+        key = cache_key(path, params)
+        entry = self.cache.get(key)
+        if entry is not None:
+            if entry.age < policy.ttl:
+                self.metrics.record_cache(endpoint, "hit")
+                return entry.json()
+            if entry.age < policy.ttl + policy.stale_ttl:
+                self.metrics.record_cache(endpoint, "stale")
+                self._revalidate(endpoint, key, path, params, entry)
+                return entry.json()
+        try:
+            data, outcome = await self._fetch_and_store(endpoint, key, path, params, entry)
+        except (httpx.HTTPError, CircuitOpenError) as e:
+            if entry is None:
+                self.metrics.record_cache(endpoint, "miss")
+                raise
+            print(f"Serving stale cache ({key}): {e}")
+            self.metrics.record_cache(endpoint, "fallback")
+            return entry.json()
+        self.metrics.record_cache(endpoint, outcome)
+        return data
+
+    async def _fetch_and_store(self, endpoint: str, key: str, path: str,
+                               params: Optional[dict], entry: Optional[CacheEntry]) -> tuple:
+        """条件请求并写入缓存，返回 (数据, "miss" 或 "not_modified")。不记缓存统计。"""
+        headers = dict(self._headers)
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        resp = await self._request(endpoint, path, params, headers)
+        if resp.status_code == 304 and entry is not None:
+            self.cache.touch(key)
+            return entry.json(), "not_modified"
+        resp.raise_for_status()
+        data = resp.json()
+        self.cache.put(
+            key, endpoint, resp.content,
+            etag=resp.headers.get("ETag"),
+            last_modified=resp.headers.get("Last-Modified"),
+        )
+        return data, "miss"
+
+    def _revalidate(self, endpoint: str, key: str, path: str,
+                    params: Optional[dict], entry: CacheEntry):
+        """后台刷新一条过期缓存，失败时保留旧数据。熔断中不刷新。"""
+        if self.breakers.get(endpoint).is_open:
+            return
+
+        async def _run():
+            try:
+                await self._fetch_and_store(endpoint, key, path, params, entry)
+            except Exception as e:
+                print(f"Revalidate failed ({key}): {e}")
+
+        task = asyncio.create_task(_run())
+        self._bg_tasks.add(task)
+        task.add_done_callback(self._bg_tasks.discard)
+
+    def _works_page(self, data: dict) -> dict:
+        """分页结果中的作品转成 Work。原 data 可能被并发调用方共享，不就地修改。"""
+        works = [Work.from_json(w) for w in data.get("works", [])]
+        self._index_works(works)
+        return {**data, "works": works}
+
+    def _index_works(self, works: list):
+        """把作品写入本地索引，索引出错不影响正常返回。"""
+        if self.index is None or not works:
+            return
+        try:
+            self.index.add_works(works)
+        except Exception as e:
+            print(f"Index works failed: {e}")
+
     # ── 认证 ──────────────────────────────────────────
 
     async def login(self) -> bool:
@@ -64,7 +404,8 @@ class AsmrApi:
     # ── 作品列表 ──────────────────────────────────────
 
     async def get_works(self, page: int = 1, order: str = "create_date",
-                        sort: str = "desc", subtitle: int = 0) -> dict:
+                        sort: str = "desc", subtitle: int = 0,
+                        use_cache: bool = True) -> dict:
         """
         获取最新作品列表。
         
@@ -73,14 +414,17 @@ class AsmrApi:
             order: 排序字段 (create_date, release, dl_count, price, rate_average_2dp, review_count, id, random)
             sort: 排序方向 (asc, desc)
             subtitle: 是否仅字幕作品 (0=全部, 1=仅字幕)
+            use_cache: 是否使用本地响应缓存（批量同步时关闭）
         """
-        resp = await self._client.get(
+        # 随机排序每次结果都不同，不走缓存
+        endpoint = "works_random" if order == "random" else "works"
+        data = await self._get_json(
+            endpoint,
             "/works",
             params={"page": page, "order": order, "sort": sort, "subtitle": subtitle},
-            headers=self._headers,
+            use_cache=use_cache,
         )
-        resp.raise_for_status()
-        return resp.json()
+        return self._works_page(data)
 
     # ── 搜索 ──────────────────────────────────────────
 
@@ -97,58 +441,97 @@ class AsmrApi:
             sort: 排序方向
             subtitle: 是否仅字幕作品
         """
-        resp = await self._client.get(
+        data = await self._get_json(
+            "search",
             f"/search/{keyword}",
             params={"page": page, "order": order, "sort": sort, "subtitle": subtitle},
-            headers=self._headers,
         )
-        resp.raise_for_status()
-        return resp.json()
+        return self._works_page(data)
 
     # ── 单个作品 ──────────────────────────────────────
 
-    async def get_work(self, work_id: int) -> dict:
+    async def get_work(self, work_id: int) -> Work:
         """获取单个作品详情。"""
-        resp = await self._client.get(f"/work/{work_id}", headers=self._headers)
-        resp.raise_for_status()
-        return resp.json()
+        work = Work.from_json(await self._get_json("work", f"/work/{work_id}"))
+        self._index_works([work])
+        return work
 
     # ── 音轨 ──────────────────────────────────────────
 
     async def get_tracks(self, work_id: int) -> list:
-        """获取作品的音轨文件列表。"""
-        resp = await self._client.get(f"/tracks/{work_id}", headers=self._headers)
-        resp.raise_for_status()
-        return resp.json()
+        """获取作品的音轨树（Track 列表）。"""
+        return Track.tree(await self._get_json("tracks", f"/tracks/{work_id}"))
+
+    async def iter_tracks(self, work_id: int) -> AsyncIterator[Track]:
+        """
+        逐个产出顶层音轨条目（文件夹连同其子树），供详情页边收边显示。
+        只有一个顶层文件夹（整个作品放在一个根目录里）时，它要整体收完才产出，
+        这种情况下与 get_tracks 一样要等完整响应。
+        本地有缓存时（不论新旧）按 get_tracks 的缓存规则返回；
+        没有缓存时流式下载，完整收到后写入缓存。
+        """
+        path = f"/tracks/{work_id}"
+        key = cache_key(path)
+        cacheable = self.cache is not None and self.cache.policy("tracks") is not None
+        if cacheable and self.cache.get(key) is not None:
+            for track in await self.get_tracks(work_id):
+                yield track
+            return
+
+        body = bytearray() if cacheable else None
+        stream = self._stream_array(
+            "tracks", path, body=body, cache_result="miss" if cacheable else "bypass"
+        )
+        async with contextlib.aclosing(stream):
+            async for item in stream:
+                yield Track.from_json(item)
+        if cacheable:
+            self.cache.put(key, "tracks", bytes(body))
 
     # ── 标签 ──────────────────────────────────────────
 
     async def get_tags(self) -> list:
         """获取所有标签（需要登录）。"""
-        resp = await self._client.get("/tags", headers=self._headers)
-        resp.raise_for_status()
-        return resp.json()
+        return await self._get_json("tags", "/tags")
+
+    def iter_tags(self) -> AsyncIterator[dict]:
+        """流式获取标签列表，边下载边逐条产出（需要登录）。不经本地缓存。"""
+        return self._stream_array("tags", "/tags")
 
     # ── 声优 ──────────────────────────────────────────
 
     async def get_vas(self) -> list:
         """获取所有声优列表（需要登录）。"""
-        resp = await self._client.get("/vas", headers=self._headers)
-        resp.raise_for_status()
-        return resp.json()
+        return await self._get_json("vas", "/vas")
+
+    def iter_vas(self) -> AsyncIterator[dict]:
+        """流式获取声优列表，边下载边逐条产出（需要登录）。不经本地缓存。"""
+        return self._stream_array("vas", "/vas")
 
     # ── 社团 ──────────────────────────────────────────
 
     async def get_circles(self) -> list:
         """获取所有社团列表（需要登录）。"""
-        resp = await self._client.get("/circles", headers=self._headers)
-        resp.raise_for_status()
-        return resp.json()
+        return await self._get_json("circles", "/circles")
+
+    def iter_circles(self) -> AsyncIterator[dict]:
+        """流式获取社团列表，边下载边逐条产出（需要登录）。不经本地缓存。"""
+        return self._stream_array("circles", "/circles")
+
+    # ── 封面 ──────────────────────────────────────────
 
-    # ── 封面 URL ──────────────────────────────────────
+    async def get_cover(self, work_id: int, size: str = "main") -> bytes:
+        """下载封面图原始字节。封面有自己的令牌桶和熔断器，不挤占 API 请求。"""
+        async def _fetch() -> bytes:
+            resp = await self._request(
+                "cover", f"/cover/{work_id}.jpg", {"type": size}, bucket=self._cover_bucket
+            )
+            resp.raise_for_status()
+            return resp.content
 
-    @staticmethod
-    def cover_url(work_id: int, size: str = "main") -> str:
+        return await self._inflight.run(("GET", f"/cover/{work_id}.jpg", size), _fetch)
+
+    def cover_url(self, work_id: int, size: str = "main") -> str:
         """
         生成封面图 URL。
 
@@ -156,24 +539,131 @@ class AsmrApi:
             work_id: 作品 ID
             size: 图片尺寸 ('sam'=缩略图, '240x240'=小图, 'main'=原图)
         """
-        return f"{BASE_URL}/cover/{work_id}.jpg?type={size}"
+        return f"{self.base_url.rstrip('/')}/cover/{work_id}.jpg?type={size}"
+
+
+# ── 同步客户端 ───────────────────────────────────────
+
+class SyncAsmrApi:
+    """
+    同步客户端，供脚本使用。
+    后台线程里常驻一个事件循环和一个 AsmrApi 会话，所有调用共享连接池；
+    *_many 批量方法并发请求，结果按输入顺序返回。
+
+    使用示例:
+        with SyncAsmrApi() as api:
+            works = api.get_works(page=1)
+            results = api.search_many(["治愈", "耳语"])
+    """
+
+    def __init__(self, api: Optional[AsmrApi] = None, concurrency: int = 8, **kwargs):
+        """
+        参数:
+            api: 使用已有的 AsmrApi 配置（未启动的），默认按 kwargs 新建
+            concurrency: 批量方法同时进行的请求数上限
+        """
+        self._api = api or AsmrApi(**kwargs)
+        self.concurrency = concurrency
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="asmr-api-loop", daemon=True
+        )
+        self._thread.start()
+        self._call(self._api.start())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _call(self, coro) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def close(self):
+        """关闭会话并停止后台线程。"""
+        if self._loop.is_closed():
+            return
+        self._call(self._api.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def _gather(self, calls: list, return_exceptions: bool) -> list:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def limited(call):
+            async with semaphore:
+                return await call()
+
+        return await asyncio.gather(
+            *(limited(c) for c in calls), return_exceptions=return_exceptions
+        )
+
+    def _many(self, calls: list, return_exceptions: bool) -> list:
+        return self._call(self._gather(calls, return_exceptions))
+
+    # ── 单次调用 ──────────────────────────────────────
+
+    def get_works(self, page: int = 1, **kwargs) -> dict:
+        return self._call(self._api.get_works(page=page, **kwargs))
+
+    def search(self, keyword: str, page: int = 1, **kwargs) -> dict:
+        return self._call(self._api.search(keyword, page=page, **kwargs))
+
+    def get_work(self, work_id: int) -> Work:
+        return self._call(self._api.get_work(work_id))
+
+    def get_tracks(self, work_id: int) -> list:
+        return self._call(self._api.get_tracks(work_id))
+
+    # ── 批量调用 ──────────────────────────────────────
+    # return_exceptions=True 时失败的项以异常对象占位，否则第一个错误直接抛出
+
+    def get_works_many(self, pages: Iterable[int], return_exceptions: bool = False,
+                       **kwargs) -> list:
+        """并发获取多页作品列表。"""
+        calls = [lambda p=p: self._api.get_works(page=p, **kwargs) for p in pages]
+        return self._many(calls, return_exceptions)
+
+    def search_many(self, keywords: Iterable[str], page: int = 1,
+                    return_exceptions: bool = False, **kwargs) -> list:
+        """并发搜索多个关键词（每个关键词取同一页）。"""
+        calls = [lambda k=k: self._api.search(k, page=page, **kwargs) for k in keywords]
+        return self._many(calls, return_exceptions)
+
+    def get_work_many(self, work_ids: Iterable[int], return_exceptions: bool = False) -> list:
+        """并发获取多个作品详情。"""
+        calls = [lambda i=i: self._api.get_work(i) for i in work_ids]
+        return self._many(calls, return_exceptions)
+
+    def get_tracks_many(self, work_ids: Iterable[int], return_exceptions: bool = False) -> list:
+        """并发获取多个作品的音轨列表。"""
+        calls = [lambda i=i: self._api.get_tracks(i) for i in work_ids]
+        return self._many(calls, return_exceptions)
 
 
 # ── 同步便捷函数 ─────────────────────────────────────
+# 共用一个进程级的 SyncAsmrApi，首次调用时创建，进程退出时关闭
+
+_default_sync: Optional[SyncAsmrApi] = None
+_default_sync_lock = threading.Lock()
+
+
+def _sync_client() -> SyncAsmrApi:
+    global _default_sync
+    with _default_sync_lock:
+        if _default_sync is None:
+            _default_sync = SyncAsmrApi()
+            atexit.register(_default_sync.close)
+        return _default_sync
+
 
 def search_sync(keyword: str, page: int = 1) -> dict:
     """同步搜索（便捷函数）。"""
-    import asyncio
-    async def _do():
-        async with AsmrApi() as api:
-            return await api.search(keyword, page=page)
-    return asyncio.run(_do())
+    return _sync_client().search(keyword, page=page)
 
 
 def get_works_sync(page: int = 1) -> dict:
     """同步获取作品列表（便捷函数）。"""
-    import asyncio
-    async def _do():
-        async with AsmrApi() as api:
-            return await api.get_works(page=page)
-    return asyncio.run(_do())
+    return _sync_client().get_works(page=page)
@@ -0,0 +1,337 @@
+"""
+基准测试
+对本地假服务器（bench.stub_server）运行一组固定的测量，
+结果连同当前提交号追加到 bench_output.txt（每行一条 JSON），
+并与上一次相同参数的结果比较，指标变差超过阈值时标出回归。
+
+用法:
+    python -m bench.run
+    python -m bench.run --only api_throughput,track_tree --latency 50
+    python -m bench.run --fail-on-regression   # 有回归时退出码为 1
+
+指标命名约定：*_ms / *_kb 越小越好，*_per_s 越大越好，其余只做记录。
+"""
+
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Optional
+
+import flet as ft
+
+from asmr_api import AsmrApi
+from bench.stub_server import StubConfig, StubServer, make_page, make_tracks
+from components.work_card import WorkCard
+from pages.detail_page import DetailPage
+from pages.home_page import HomePage
+from services.models import Track, Work
+from services.ui_updates import UpdateScheduler
+
+ROOT = Path(__file__).resolve().parent.parent
+
+BENCHMARKS: dict[str, Callable] = {}
+
+
+def benchmark(name: str):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+class _HeadlessPage:
+    """没有 Flet 前端时给 UpdateScheduler 用的最小页面：刷新全部丢弃"""
+
+    on_app_lifecycle_state_change = None
+
+    def run_task(self, handler, *args):
+        return asyncio.ensure_future(handler(*args))
+
+    def update(self, *controls):
+        pass
+
+
+def _api(server: StubServer) -> AsmrApi:
+    # 基准只测客户端本身，关掉客户端限速
+    return AsmrApi(base_url=server.base_url, rate=1e9)
+
+
+# ── 测量项 ───────────────────────────────────────────
+
+@benchmark("api_throughput")
+async def bench_api_throughput(server: StubServer, args) -> dict:
+    """并发请求不同页的吞吐量与延迟分布"""
+    async with _api(server) as api:
+        queue: asyncio.Queue = asyncio.Queue()
+        for page in range(1, args.requests + 1):
+            queue.put_nowait(page)
+
+        async def worker():
+            while not queue.empty():
+                await api.get_works(page=queue.get_nowait(), use_cache=False)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        latency = api.metrics.endpoints["works"].latency
+    return {
+        "requests_per_s": round(args.requests / elapsed, 1),
+        "p50_ms": round(latency.quantile(0.50) * 1000, 2),
+        "p95_ms": round(latency.quantile(0.95) * 1000, 2),
+        "p99_ms": round(latency.quantile(0.99) * 1000, 2),
+    }
+
+
+@benchmark("cold_import")
+async def bench_cold_import(server: StubServer, args) -> dict:
+    """新进程导入 main 模块（启动时需要加载的代码）的耗时"""
+    code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    samples = []
+    for _ in range(args.repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout
+        samples.append(float(out.strip().splitlines()[-1]) * 1000)
+    return {"median_ms": round(statistics.median(samples), 2)}
+
+
+@benchmark("home_time_to_grid")
+async def bench_home_time_to_grid(server: StubServer, args) -> dict:
+    """HomePage.load_data 从调用到网格里有作品的时间"""
+    samples = []
+    async with _api(server) as api:
+        for _ in range(args.repeat):
+            home = HomePage(api)
+            started = time.perf_counter()
+            await home.load_data()
+            if home.grid.work_count == 0:
+                raise RuntimeError("首页没有加载到作品")
+            samples.append((time.perf_counter() - started) * 1000)
+            home._prefetcher.reset()
+    return {
+        "median_ms": round(statistics.median(samples), 2),
+        "max_ms": round(max(samples), 2),
+    }
+
+
+@benchmark("work_card")
+async def bench_work_card(server: StubServer, args) -> dict:
+    """WorkCard 构造与换绑速度"""
+    config = server.config
+    works = []
+    page = 1
+    while len(works) < args.cards:
+        works += [Work.from_json(w) for w in make_page(page, config)["works"]]
+        page += 1
+    works = works[:args.cards]
+    api = AsmrApi(base_url=server.base_url)  # 只用来生成封面地址，不发请求
+    samples = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        for work in works:
+            WorkCard(work, api=api)
+        samples.append(time.perf_counter() - started)
+    elapsed = statistics.median(samples)
+
+    # 回收池里的卡片换绑新作品
+    card = WorkCard(works[0], api=api)
+    samples = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        for work in works:
+            card.bind(work)
+        samples.append(time.perf_counter() - started)
+    rebind = statistics.median(samples)
+    return {
+        "cards_per_s": round(len(works) / elapsed, 1),
+        "per_card_ms": round(elapsed / len(works) * 1000, 4),
+        "rebinds_per_s": round(len(works) / rebind, 1),
+    }
+
+
+@benchmark("track_tree")
+async def bench_track_tree(server: StubServer, args) -> dict:
+    """大音轨树：首次构建与全部展开的耗时"""
+    config = StubConfig(folders=8, files_per_folder=60, tree_depth=2)
+    tree = make_tracks(1, config)
+
+    def count(items):
+        return sum(1 + count(i.get("children", [])) for i in items)
+
+    samples = []
+    for _ in range(args.repeat):
+        detail = DetailPage(Work(1, "bench"), api=AsmrApi(base_url=server.base_url),
+                            audio_player=None)
+        base = len(detail.list_view.controls)
+        started = time.perf_counter()
+        tracks = Track.tree(tree)
+        detail._build_track_list(tracks, None)
+        detail._expand_single_folder(tracks)
+        samples.append(time.perf_counter() - started)
+    initial = statistics.median(samples)
+    initial_rows = len(detail.list_view.controls) - base
+
+    started = time.perf_counter()
+    i = base
+    while i < len(detail.list_view.controls):
+        row = detail.list_view.controls[i]
+        if isinstance(row.data, dict) and "children" in row.data and not row.data["expanded"]:
+            detail._toggle_folder(row)
+        i += 1
+    expand_all = time.perf_counter() - started
+    return {
+        "nodes": count(tree),
+        "initial_rows": initial_rows,
+        "initial_ms": round(initial * 1000, 2),
+        "expand_all_ms": round(expand_all * 1000, 2),
+    }
+
+
+@benchmark("memory_growth")
+async def bench_memory_growth(server: StubServer, args) -> dict:
+    """连续加载 N 页首页时的内存增长"""
+    async with _api(server) as api:
+        home = HomePage(api)
+        await home.load_data()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(args.pages):
+            await home._load_more()
+        after, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        home._prefetcher.reset()
+    growth = (after - before) / 1024
+    return {
+        "pages": args.pages,
+        "growth_kb": round(growth, 1),
+        "per_page_kb": round(growth / args.pages, 1),
+        "peak_kb": round((peak - before) / 1024, 1),
+    }
+
+
+# ── 结果记录与比较 ───────────────────────────────────
+
+def _commit() -> str:
+    try:
+        head = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+            capture_output=True, text=True,
+        ).stdout.strip()
+        return head + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _direction(metric: str) -> int:
+    """1: 越大越好；-1: 越小越好；0: 只记录"""
+    if metric.endswith("_per_s"):
+        return 1
+    if metric.endswith(("_ms", "_kb")):
+        return -1
+    return 0
+
+
+def _previous(path: Path, config: dict) -> Optional[dict]:
+    if not path.exists():
+        return None
+    last = None
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if record.get("config") == config:
+            last = record
+    return last
+
+
+def compare(previous: dict, current: dict, threshold: float) -> list:
+    """返回 [(测量项, 指标, 旧值, 新值, 变化比例, 是否回归), ...]"""
+    rows = []
+    for name, metrics in current["results"].items():
+        old_metrics = previous["results"].get(name, {})
+        for metric, new in metrics.items():
+            old = old_metrics.get(metric)
+            direction = _direction(metric)
+            if old in (None, 0) or not direction:
+                continue
+            change = (new - old) / old
+            rows.append((name, metric, old, new, change, -direction * change > threshold))
+    return rows
+
+
+async def run(args) -> dict:
+    config = StubConfig(latency=args.latency / 1000, jitter=args.jitter / 1000)
+    server = StubServer(config).start_in_thread()
+    scheduler = UpdateScheduler(_HeadlessPage()).start()
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    results = {}
+    try:
+        for name in names:
+            results[name] = await BENCHMARKS[name](server, args)
+            print(f"{name:20s} {results[name]}")
+    finally:
+        scheduler.stop()
+        server.stop_thread()
+    return results
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="对本地假服务器运行基准测试")
+    parser.add_argument("--only", help="只运行这些测量项（逗号分隔）: " + ",".join(BENCHMARKS))
+    parser.add_argument("--latency", type=float, default=20, help="假服务器延迟（毫秒）")
+    parser.add_argument("--jitter", type=float, default=0, help="假服务器随机延迟上限（毫秒）")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--cards", type=int, default=2000)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--output", default=str(ROOT / "bench_output.txt"))
+    parser.add_argument("--threshold", type=float, default=0.10, help="判定回归的变化比例")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    config = {k: v for k, v in vars(args).items()
+              if k not in ("output", "threshold", "fail_on_regression")}
+    record = {
+        "commit": _commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "flet": getattr(ft, "__version__", "?"),
+        "config": config,
+        "results": asyncio.run(run(args)),
+    }
+
+    output = Path(args.output)
+    previous = _previous(output, config)
+    with open(output, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    if previous is None:
+        print(f"\n结果已写入 {output}（没有可比较的历史结果）")
+        return
+    rows = compare(previous, record, args.threshold)
+    print(f"\n对比 {previous['commit']} → {record['commit']}:")
+    regressed = False
+    for name, metric, old, new, change, bad in rows:
+        regressed |= bad
+        mark = "  <-- 回归" if bad else ""
+        print(f"  {name}.{metric}: {old} → {new} ({change:+.1%}){mark}")
+    if regressed and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+本地假 asmr API 服务器
+按与真实接口相同的路径和结构返回数据，延迟和数据量可配置，供基准测试使用。
+数据由作品 ID 确定性生成（同样参数每次结果相同）；指定 fixtures 目录时
+优先返回录制好的 JSON（文件名为路径各段用 _ 连接，如 tracks_123.json，
+找不到再按接口名找，如 tracks.json）。
+
+单独运行（再让应用连到它）:
+    python -m bench.stub_server --port 8765 --latency 80
+    ASMR_API_BASE_URL=http://127.0.0.1:8765/api flet run main.py
+"""
+
+import asyncio
+import json
+import random
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+
+@dataclass
+class StubConfig:
+    """假服务器参数"""
+
+    latency: float = 0.02        # 每个请求的固定延迟（秒）
+    jitter: float = 0.0          # 额外的随机延迟上限（秒）
+    page_size: int = 20
+    total_works: int = 10000
+    tags_per_work: int = 8
+    folders: int = 4             # 音轨树每层的文件夹数
+    files_per_folder: int = 30
+    tree_depth: int = 2
+    cover_bytes: int = 30 * 1024
+    dictionary_size: int = 5000  # /tags /vas /circles 的条目数
+    seed: int = 1
+    fixtures: Optional[Path] = None
+
+
+# ── 数据生成 ─────────────────────────────────────────
+
+def make_work(work_id: int, config: StubConfig) -> dict:
+    rng = random.Random(config.seed * 1_000_003 + work_id)
+    circle_id = rng.randrange(1, 2000)
+    return {
+        "id": work_id,
+        "title": f"作品 {work_id} " + "".join(rng.choice("治愈耳语睡眠安眠") for _ in range(12)),
+        "circle_id": circle_id,
+        "name": f"社团 {circle_id}",
+        "circle": {"id": circle_id, "name": f"社团 {circle_id}"},
+        "nsfw": False,
+        "release": f"20{rng.randrange(15, 25)}-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+        "create_date": f"20{rng.randrange(15, 25)}-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+        "dl_count": rng.randrange(0, 50000),
+        "price": rng.choice((0, 440, 880, 1320)),
+        "review_count": rng.randrange(0, 500),
+        "rate_count": rng.randrange(0, 2000),
+        "rate_average_2dp": round(rng.uniform(2.5, 5.0), 2),
+        "has_subtitle": rng.random() < 0.3,
+        "tags": [
+            {"id": t, "name": f"标签 {t}"}
+            for t in rng.sample(range(1, config.dictionary_size), config.tags_per_work)
+        ],
+        "vas": [{"id": f"va-{v}", "name": f"声优 {v}"} for v in rng.sample(range(1, 800), 2)],
+    }
+
+
+def make_page(page: int, config: StubConfig) -> dict:
+    first = (page - 1) * config.page_size
+    ids = range(config.total_works - first, max(config.total_works - first - config.page_size, 0), -1)
+    return {
+        "works": [make_work(i, config) for i in ids],
+        "pagination": {
+            "currentPage": page,
+            "pageSize": config.page_size,
+            "totalCount": config.total_works,
+        },
+    }
+
+
+def make_tracks(work_id: int, config: StubConfig, depth: int = 0, prefix: str = "") -> list:
+    items = []
+    if depth < config.tree_depth:
+        for i in range(config.folders):
+            title = f"{prefix}文件夹{i + 1}"
+            items.append({
+                "type": "folder",
+                "title": title,
+                "children": make_tracks(work_id, config, depth + 1, f"{title}-"),
+            })
+    for i in range(config.files_per_folder):
+        url = f"https://example.invalid/media/{work_id}/{prefix}{i + 1}.mp3"
+        items.append({
+            "type": "audio",
+            "title": f"{prefix}{i + 1:02d}.mp3",
+            "hash": f"{work_id}/{prefix}{i}",
+            "duration": 60 + i * 7,
+            "size": 1_000_000 + i,
+            "mediaStreamUrl": url,
+            "mediaDownloadUrl": url,
+        })
+    return items
+
+
+def make_dictionary(kind: str, config: StubConfig) -> list:
+    label = {"tags": "标签", "vas": "声优", "circles": "社团"}[kind]
+    return [{"id": i, "name": f"{label} {i}"} for i in range(1, config.dictionary_size + 1)]
+
+
+# ── 服务器 ───────────────────────────────────────────
+
+class StubServer:
+    """假 API 服务器（HTTP/1.1，支持 keep-alive）"""
+
+    def __init__(self, config: Optional[StubConfig] = None, host: str = "127.0.0.1",
+                 port: int = 0):
+        self.config = config or StubConfig()
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._handlers: set = set()  # 各连接的处理任务
+        self._rng = random.Random(self.config.seed)
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/api"
+
+    # ── 生命周期 ──────────────────────────────────────
+
+    async def start(self) -> "StubServer":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def aclose(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        # keep-alive 连接的处理任务还在等下一个请求：取消并等它们结束，
+        # 否则停掉事件循环时会报 "Task was destroyed but it is pending"
+        handlers = list(self._handlers)
+        for task in handlers:
+            task.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+
+    def start_in_thread(self) -> "StubServer":
+        """在独立线程的事件循环里运行，避免和被测代码争用同一个循环。"""
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="stub-server", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop_thread(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.aclose(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop = None
+
+    # ── 请求处理 ──────────────────────────────────────
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                method, target, _ = request.decode("latin-1").split("\r\n", 1)[0].split(" ", 2)
+                self.requests += 1
+                delay = self.config.latency + self._rng.uniform(0, self.config.jitter)
+                if delay:
+                    await asyncio.sleep(delay)
+                status, content_type, body = self._route(target)
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                        f"Content-Length: {len(body)}\r\n\r\n"
+                    ).encode("latin-1")
+                )
+                if method != "HEAD":
+                    writer.write(body)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # aclose() 取消的，正常结束即可：Python 3.11 的 start_server
+            # 回调对以取消状态结束的任务调用 exception() 会再报一次错
+            pass
+        finally:
+            self._handlers.discard(task)
+            writer.close()
+
+    def _route(self, target: str) -> tuple:
+        url = urlsplit(target)
+        parts = [unquote(p) for p in url.path.split("/") if p][1:]  # 去掉 api 前缀
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if not parts:
+            return "404 Not Found", "text/plain", b""
+
+        fixture = self._fixture(parts)
+        if fixture is not None:
+            return "200 OK", "application/json", fixture
+
+        endpoint, config = parts[0], self.config
+        page = int(query.get("page", 1))
+        if endpoint in ("works", "search"):
+            data = make_page(page, config)
+        elif endpoint == "work" and len(parts) > 1:
+            data = make_work(int(parts[1]), config)
+        elif endpoint == "tracks" and len(parts) > 1:
+            data = make_tracks(int(parts[1]), config)
+        elif endpoint in ("tags", "vas", "circles"):
+            data = make_dictionary(endpoint, config)
+        elif endpoint == "cover":
+            return "200 OK", "image/jpeg", b"\xff\xd8" + b"\0" * max(0, config.cover_bytes - 2)
+        else:
+            return "404 Not Found", "text/plain", b""
+        return "200 OK", "application/json", json.dumps(data, ensure_ascii=False).encode()
+
+    def _fixture(self, parts: list) -> Optional[bytes]:
+        if self.config.fixtures is None:
+            return None
+        for name in ("_".join(parts), parts[0]):
+            path = self.config.fixtures / f"{name}.json"
+            if path.exists():
+                return path.read_bytes()
+        return None
+
+
+# ── 命令行 ───────────────────────────────────────────
+
+async def _main(args):
+    config = StubConfig(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        page_size=args.page_size,
+        fixtures=Path(args.fixtures) if args.fixtures else None,
+    )
+    server = await StubServer(config, port=args.port).start()
+    print(f"Stub API listening on {server.base_url}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="本地假 asmr API 服务器")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=20, help="固定延迟（毫秒）")
+    parser.add_argument("--jitter", type=float, default=0, help="随机额外延迟上限（毫秒）")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--fixtures", help="录制的 JSON 目录")
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -1,13 +1,29 @@
+import asyncio
+import inspect
+
 import flet as ft
 import flet_audio as fta
+from services.ui_updates import request_update
 
 
 class AudioPlayer(ft.Container):
-    """底部音频播放条"""
+    """
+    底部音频播放条
+
+    支持播放队列：播放当前曲目时用第二个 Audio 预加载下一首，
+    当前曲目结束后直接切换过去，多段作品之间不再有停顿。
+    """
 
-    def __init__(self):
+    def __init__(self, proxy=None):
+        # 本地缓存代理（可选）：远程音频经代理播放，重播和拖动不再重复下载
+        self._proxy = proxy
         # Audio 是 Service 类型，需要在 page 存在后才能创建，延迟到 play() 中初始化
         self.audio = None
+        self._standby = None       # 预加载下一首用的备用 Audio
+        self._standby_item = None  # 备用 Audio 已加载的队列条目
+        self._standby_duration_ms = 0  # 备用 Audio 报告的时长，切换时沿用
+        self._queue = None
+        self._page = None
         self.is_playing = False
         self.duration_ms = 0
         self.position_ms = 0
@@ -73,76 +89,166 @@ class AudioPlayer(ft.Container):
             visible=False,
         )
 
-    def _ensure_audio(self, page: ft.Page):
-        """确保 Audio Service 已创建（必须在 page 上下文中）"""
-        if self.audio is not None:
-            return
-        self.audio = fta.Audio(
+    def _new_audio(self):
+        return fta.Audio(
             src="",
             autoplay=False,
             on_position_changed=self._on_position_change,
             on_state_changed=self._on_state_change,
             on_duration_changed=self._on_duration_change,
         )
+
+    def _ensure_audio(self, page: ft.Page):
+        """确保 Audio Service 已创建（必须在 page 上下文中）"""
+        if self.audio is not None:
+            return
+        self.audio = self._new_audio()
+        self._standby = self._new_audio()
         page.overlay.append(self.audio)
+        page.overlay.append(self._standby)
         page.update()
 
+    def _source(self, url: str) -> str:
+        """远程地址经本地缓存代理播放"""
+        if self._proxy and url.startswith("http"):
+            return self._proxy.url_for(url)
+        return url
+
+    @staticmethod
+    def _invoke(method, *args):
+        """调用 Audio 方法，兼容同步与异步两种 Flet 版本"""
+        result = method(*args)
+        if inspect.isawaitable(result):
+            asyncio.ensure_future(result)
+
     def play(self, url: str, title: str, page: ft.Page):
-        """播放指定音频"""
+        """播放单个音频（清空播放队列）"""
+        self._queue = None
+        self._start(url, title, page)
+
+    def play_queue(self, queue, page: ft.Page):
+        """从 queue 的当前位置开始连续播放"""
+        self._queue = queue
+        item = queue.current
+        if item is not None:
+            self._start(queue.url_of(item), item.title, page)
+
+    def _start(self, url: str, title: str, page: ft.Page):
         try:
+            self._page = page
             self._ensure_audio(page)
             self.current_title = title
             self.title_text.value = title
-            self.audio.src = url
+            self.audio.src = self._source(url)
             self.audio.autoplay = True
             self.is_playing = True
             self.play_btn.icon = ft.Icons.PAUSE_CIRCLE_FILLED_ROUNDED
             self.visible = True
+            self._prepare_next(page)
             page.update()
         except Exception as e:
             print(f"Play Error: {e}")
-            page.snack_bar = ft.SnackBar(ft.Text(f"播放出错: {e}"), bgcolor=ft.Colors.RED)
-            page.snack_bar.open = True
-            page.update()
+            page.show_dialog(ft.SnackBar(ft.Text(f"播放出错: {e}"), bgcolor=ft.Colors.RED))
+
+    def _prepare_next(self, page: ft.Page):
+        """让备用 Audio 预先加载队列中的下一首"""
+        item = self._queue.next if self._queue else None
+        self._standby_item = None
+        self._standby_duration_ms = 0
+        if item is None or self._standby is None:
+            return
+        url = self._queue.url_of(item)
+        if not url:
+            return
+        # 代理先缓存开头一段，切换时不必等网络
+        if self._proxy and url.startswith("http"):
+            page.run_task(self._proxy.preload, url)
+        self._standby.autoplay = False
+        self._standby.src = self._source(url)
+        self._standby_item = item
+
+    def _advance(self) -> bool:
+        """当前曲目结束：切换到已预加载的下一首。无下一首返回 False。"""
+        if self._queue is None or self._standby_item is None:
+            return False
+        item = self._queue.advance()
+        if item is not self._standby_item:
+            return False
+        self.audio, self._standby = self._standby, self.audio
+        self._invoke(self.audio.play)
+        self.current_title = item.title
+        self.title_text.value = item.title
+        self.position_ms = 0
+        # 备用 Audio 加载时已报告过时长，切换后不会再有 duration 事件
+        self.duration_ms = self._standby_duration_ms
+        self.progress.value = 0
+        self.time_text.value = f"{self._fmt(0)} / {self._fmt(self.duration_ms)}"
+        self._prepare_next(self._page)
+        self._page.update()
+        return True
 
     def _toggle_play(self, e):
         try:
             if self.audio is None:
                 return
             if self.is_playing:
-                self.audio.pause()
+                self._invoke(self.audio.pause)
                 self.play_btn.icon = ft.Icons.PLAY_CIRCLE_FILLED_ROUNDED
                 self.is_playing = False
             else:
-                self.audio.resume()
+                self._invoke(self.audio.resume)
                 self.play_btn.icon = ft.Icons.PAUSE_CIRCLE_FILLED_ROUNDED
                 self.is_playing = True
             self.update()
         except Exception as e:
             print(f"Toggle Error: {e}")
-            if self.page:
-                self.page.snack_bar = ft.SnackBar(ft.Text(f"切换播放出错: {e}"), bgcolor=ft.Colors.RED)
-                self.page.snack_bar.open = True
-                self.page.update()
+            if self._page:
+                self._page.show_dialog(
+                    ft.SnackBar(ft.Text(f"切换播放出错: {e}"), bgcolor=ft.Colors.RED)
+                )
 
     def _on_position_change(self, e):
+        if e.control is not self.audio:
+            return
         self.position_ms = int(e.position)
         if self.duration_ms > 0:
             self.progress.value = self.position_ms / self.duration_ms
         self.time_text.value = (
             f"{self._fmt(self.position_ms)} / {self._fmt(self.duration_ms)}"
         )
-        self.update()
+        # 播放进度事件很密集，合并到下一帧再刷新
+        request_update(self)
 
     def _on_state_change(self, e):
-        if e.state == "completed":
+        # 备用 Audio 的事件不影响界面
+        if e.control is not self.audio:
+            return
+        if e.state == fta.AudioState.COMPLETED:
+            if self._advance():
+                return
             self.is_playing = False
             self.play_btn.icon = ft.Icons.PLAY_CIRCLE_FILLED_ROUNDED
             self.progress.value = 0
             self.update()
 
     def _on_duration_change(self, e):
-        self.duration_ms = int(e.duration)
+        duration_ms = self._to_ms(e.duration)
+        if e.control is self._standby:
+            # 备用 Audio 预加载时报告的时长，切换过去时使用
+            self._standby_duration_ms = duration_ms
+        elif e.control is self.audio:
+            self.duration_ms = duration_ms
+            self.time_text.value = (
+                f"{self._fmt(self.position_ms)} / {self._fmt(self.duration_ms)}"
+            )
+            request_update(self)
+
+    @staticmethod
+    def _to_ms(value) -> int:
+        """flet_audio 0.80 的时长是 ft.Duration，旧版本是毫秒整数"""
+        if hasattr(value, "in_milliseconds"):
+            return int(value.in_milliseconds)
+        return int(value or 0)
 
     @staticmethod
     def _fmt(ms: int) -> str:
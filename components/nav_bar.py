@@ -1,15 +1,24 @@
 """
 底部导航栏组件
 Material 风格底部导航，支持首页和搜索切换。
+短时间内连续快速点击当前所在的导航项可打开隐藏的性能面板
+（点击当前项不会切换页面，计数过程中 selected_index 始终不变）。
 """
 
+import inspect
+import time
+
 import flet as ft
 
 
 class NavBar(ft.NavigationBar):
     """底部导航栏"""
 
-    def __init__(self, on_change=None):
+    # 打开隐藏面板：HIDDEN_WINDOW 秒内连续点击当前项 HIDDEN_TAPS 次
+    HIDDEN_TAPS = 5
+    HIDDEN_WINDOW = 2.0
+
+    def __init__(self, on_change=None, on_hidden=None):
         super().__init__(
             destinations=[
                 ft.NavigationBarDestination(
@@ -31,4 +40,26 @@ class NavBar(ft.NavigationBar):
             shadow_color=ft.Colors.BLACK,
             overlay_color=ft.Colors.with_opacity(0.1, ft.Colors.DEEP_PURPLE),
         )
-        self.on_change = on_change
+        self._on_change = on_change
+        self._on_hidden = on_hidden
+        self._taps: list = []
+        self._current = self.selected_index
+        self.on_change = self._handle_change
+
+    async def _handle_change(self, e):
+        if self.selected_index == self._current:
+            # 重复点击当前项：不切换页面，只计数
+            now = time.monotonic()
+            self._taps = [t for t in self._taps if now - t < self.HIDDEN_WINDOW] + [now]
+            if self._on_hidden and len(self._taps) >= self.HIDDEN_TAPS:
+                self._taps.clear()
+                result = self._on_hidden()
+                if inspect.isawaitable(result):
+                    await result
+            return
+        self._current = self.selected_index
+        self._taps.clear()
+        if self._on_change:
+            result = self._on_change(e)
+            if inspect.isawaitable(result):
+                await result
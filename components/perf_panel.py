@@ -0,0 +1,133 @@
+"""
+性能面板（隐藏调试页）
+按接口展示请求次数、p50/p95/p99 耗时、流量、错误、重试和缓存命中，
+以及界面刷新等通用耗时；可导出 JSON / Prometheus 文本到本地。
+"""
+
+import flet as ft
+from services.metrics import Metrics
+
+
+def _ms(seconds) -> str:
+    return "-" if seconds is None else f"{seconds * 1000:.0f}"
+
+
+def _size(n: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.0f}{unit}"
+        n /= 1024
+    return f"{n:.1f}GB"
+
+
+class PerfPanel(ft.Column):
+    """性能面板"""
+
+    def __init__(self, metrics: Metrics, on_back=None):
+        super().__init__(expand=True, spacing=0)
+        self._metrics = metrics
+        self._on_back = on_back
+
+        self.table = ft.Column(spacing=4)
+        self.status_text = ft.Text("", size=11, color=ft.Colors.WHITE38)
+
+        header = ft.Container(
+            content=ft.Row(
+                controls=[
+                    ft.IconButton(
+                        icon=ft.Icons.ARROW_BACK_ROUNDED,
+                        icon_color=ft.Colors.WHITE,
+                        on_click=self._go_back,
+                    ),
+                    ft.Text(
+                        "性能统计",
+                        size=16,
+                        weight=ft.FontWeight.W_600,
+                        color=ft.Colors.WHITE,
+                        expand=True,
+                    ),
+                    ft.IconButton(
+                        icon=ft.Icons.REFRESH_ROUNDED,
+                        icon_color=ft.Colors.WHITE70,
+                        tooltip="刷新",
+                        on_click=lambda e: self.refresh(),
+                    ),
+                    ft.IconButton(
+                        icon=ft.Icons.SAVE_ALT_ROUNDED,
+                        icon_color=ft.Colors.WHITE70,
+                        tooltip="导出",
+                        on_click=self._export,
+                    ),
+                ],
+                spacing=4,
+            ),
+            padding=ft.padding.only(left=4, right=8, top=8, bottom=0),
+        )
+
+        self.controls = [
+            header,
+            ft.ListView(
+                controls=[self.table, self.status_text],
+                expand=True,
+                padding=ft.padding.only(left=16, right=16, bottom=100),
+            ),
+        ]
+        self.refresh(update=False)
+
+    def refresh(self, update: bool = True):
+        """按当前统计重建表格"""
+        snap = self._metrics.snapshot()
+        rows = [self._row(("接口", "次数", "p50", "p95", "p99", "流量", "错误", "重试", "缓存"),
+                          header=True)]
+        for name, s in snap["endpoints"].items():
+            cache = s["cache"]
+            # 每次查找只记一种结果；bypass 不算查找，miss 之外都由缓存提供
+            lookups = sum(n for k, n in cache.items() if k != "bypass")
+            hits = lookups - cache.get("miss", 0)
+            rows.append(self._row((
+                name, str(s["count"]), _ms(s["p50"]), _ms(s["p95"]), _ms(s["p99"]),
+                _size(s["bytes"]), str(s["errors"]), str(s["retries"]),
+                f"{hits}/{lookups}" if lookups else "-",
+            )))
+        if snap["timings"]:
+            rows.append(ft.Container(height=12))
+            rows.append(self._row(("耗时项", "次数", "p50", "p95", "p99", "", "", "", ""),
+                                  header=True))
+            for name, s in snap["timings"].items():
+                rows.append(self._row((
+                    name, str(s["count"]), _ms(s["p50"]), _ms(s["p95"]), _ms(s["p99"]),
+                    "", "", "", "",
+                )))
+        self.table.controls = rows
+        self.status_text.value = f"运行 {snap['uptime']:.0f} 秒 · 耗时单位 ms"
+        if update:
+            self.update()
+
+    @staticmethod
+    def _row(cells: tuple, header: bool = False) -> ft.Row:
+        color = ft.Colors.WHITE54 if header else ft.Colors.WHITE
+        return ft.Row(
+            controls=[
+                ft.Text(
+                    text, size=11, color=color,
+                    weight=ft.FontWeight.W_600 if header else None,
+                    expand=3 if i == 0 else 1,
+                    max_lines=1,
+                    overflow=ft.TextOverflow.ELLIPSIS,
+                )
+                for i, text in enumerate(cells)
+            ],
+            spacing=4,
+        )
+
+    def _export(self, e):
+        try:
+            directory = self._metrics.export()
+            message = f"已导出到 {directory}"
+        except Exception as ex:
+            message = f"导出失败: {ex}"
+        self.page.show_dialog(ft.SnackBar(ft.Text(message)))
+
+    def _go_back(self, e):
+        if self._on_back:
+            self._on_back()
@@ -1,147 +1,209 @@
 """
 作品卡片组件
 可复用的作品展示卡片，显示封面、标题、评分等信息。
+卡片创建后可用 bind() 换绑到另一个作品；CardPool 回收离开网格的卡片，
+所有卡片共用同一组样式对象。
 """
 
+from typing import Optional
+
 import flet as ft
+from asmr_api import AsmrApi
+from services.models import Work
+from services.ui_updates import request_update
+
+# Flet 0.80 把 ImageFit 改名为 BoxFit，兼容本地调试用的旧版本
+COVER_FIT = (ft.BoxFit if hasattr(ft, "BoxFit") else ft.ImageFit).COVER
+
+# ── 共享样式 ─────────────────────────────────────────
+# 所有卡片共用，只整体替换、不就地修改
+_CENTER = ft.Alignment(0, 0)
+_COVER_RADIUS = ft.border_radius.only(top_left=12, top_right=12)
+_INFO_PADDING = ft.padding.only(left=10, right=10, top=8, bottom=10)
+_BGCOLOR = ft.Colors.with_opacity(0.15, ft.Colors.WHITE)
+_ANIMATION = ft.Animation(200, ft.AnimationCurve.EASE_OUT)
+_SHADOW = ft.BoxShadow(
+    spread_radius=0,
+    blur_radius=8,
+    color=ft.Colors.with_opacity(0.3, ft.Colors.BLACK),
+    offset=ft.Offset(0, 2),
+)
+_HOVER_SHADOW = ft.BoxShadow(
+    spread_radius=1,
+    blur_radius=16,
+    color=ft.Colors.with_opacity(0.4, ft.Colors.DEEP_PURPLE),
+    offset=ft.Offset(0, 4),
+)
+
+
+def _rate_color(rate: float) -> str:
+    """评分星星颜色"""
+    return (
+        ft.Colors.AMBER if rate >= 4.0
+        else ft.Colors.ORANGE if rate >= 3.0
+        else ft.Colors.GREY
+    )
 
 
 class WorkCard(ft.Container):
     """作品卡片 — 封面 + 标题 + 评分"""
 
-    def __init__(self, work: dict, on_click=None):
-        self.work = work
+    def __init__(self, work: Work, on_click=None, cover_cache=None,
+                 api: Optional[AsmrApi] = None):
         self._on_click = on_click
+        self._cover_cache = cover_cache
+        self._api = api  # 没有封面缓存时用它生成远程地址
 
-        work_id = work.get("id", 0)
-        title = work.get("title", "未知作品")
-        circle_name = work.get("circle", {}).get("name", "")
-        rate = work.get("rate_average_2dp", 0)
-        dl_count = work.get("dl_count", 0)
-
-        # 封面图
-        cover_url = f"https://api.asmr-200.com/api/cover/{work_id}.jpg?type=sam"
-
-        # 评分星星颜色
-        rate_color = (
-            ft.Colors.AMBER if rate >= 4.0
-            else ft.Colors.ORANGE if rate >= 3.0
-            else ft.Colors.GREY
+        # 随作品变化的控件，bind() 时更新
+        self._cover = ft.Image(
+            src="",
+            fit=COVER_FIT,
+            border_radius=_COVER_RADIUS,
+            error_content=ft.Container(
+                content=ft.Icon(
+                    ft.Icons.IMAGE_NOT_SUPPORTED,
+                    size=40,
+                    color=ft.Colors.GREY_400,
+                ),
+                alignment=_CENTER,
+            ),
         )
+        self._title = ft.Text(
+            "",
+            size=13,
+            weight=ft.FontWeight.W_600,
+            max_lines=2,
+            overflow=ft.TextOverflow.ELLIPSIS,
+            color=ft.Colors.WHITE,
+        )
+        self._circle = ft.Text(
+            "",
+            size=11,
+            color=ft.Colors.WHITE54,
+            max_lines=1,
+            overflow=ft.TextOverflow.ELLIPSIS,
+        )
+        self._star = ft.Icon(ft.Icons.STAR_ROUNDED, size=14)
+        self._rate = ft.Text("", size=12, weight=ft.FontWeight.W_600)
+        self._dl_count = ft.Text("", size=11, color=ft.Colors.WHITE38)
 
         super().__init__(
             content=ft.Column(
                 controls=[
                     # 封面图区域
                     ft.Container(
-                        content=ft.Image(
-                            src=cover_url,
-                            fit=ft.ImageFit.COVER,
-                            border_radius=ft.border_radius.only(
-                                top_left=12, top_right=12
-                            ),
-                            error_content=ft.Container(
-                                content=ft.Icon(
-                                    ft.Icons.IMAGE_NOT_SUPPORTED,
-                                    size=40,
-                                    color=ft.Colors.GREY_400,
-                                ),
-                                alignment=ft.Alignment(0, 0),
-                            ),
-                        ),
+                        content=self._cover,
+                        bgcolor=_BGCOLOR,  # 封面加载前的占位
                         height=180,
                         clip_behavior=ft.ClipBehavior.ANTI_ALIAS,
-                        border_radius=ft.border_radius.only(
-                            top_left=12, top_right=12
-                        ),
+                        border_radius=_COVER_RADIUS,
                     ),
                     # 信息区域
                     ft.Container(
                         content=ft.Column(
                             controls=[
-                                ft.Text(
-                                    title,
-                                    size=13,
-                                    weight=ft.FontWeight.W_600,
-                                    max_lines=2,
-                                    overflow=ft.TextOverflow.ELLIPSIS,
-                                    color=ft.Colors.WHITE,
-                                ),
-                                ft.Text(
-                                    circle_name,
-                                    size=11,
-                                    color=ft.Colors.WHITE54,
-                                    max_lines=1,
-                                    overflow=ft.TextOverflow.ELLIPSIS,
-                                ),
+                                self._title,
+                                self._circle,
                                 ft.Row(
                                     controls=[
-                                        ft.Icon(
-                                            ft.Icons.STAR_ROUNDED,
-                                            size=14,
-                                            color=rate_color,
-                                        ),
-                                        ft.Text(
-                                            f"{rate}",
-                                            size=12,
-                                            color=rate_color,
-                                            weight=ft.FontWeight.W_600,
-                                        ),
+                                        self._star,
+                                        self._rate,
                                         ft.Container(expand=True),
                                         ft.Icon(
                                             ft.Icons.DOWNLOAD_ROUNDED,
                                             size=12,
                                             color=ft.Colors.WHITE38,
                                         ),
-                                        ft.Text(
-                                            f"{dl_count}",
-                                            size=11,
-                                            color=ft.Colors.WHITE38,
-                                        ),
+                                        self._dl_count,
                                     ],
                                     spacing=4,
                                 ),
                             ],
                             spacing=4,
                         ),
-                        padding=ft.padding.only(left=10, right=10, top=8, bottom=10),
+                        padding=_INFO_PADDING,
                     ),
                 ],
                 spacing=0,
             ),
             border_radius=12,
-            bgcolor=ft.Colors.with_opacity(0.15, ft.Colors.WHITE),
+            bgcolor=_BGCOLOR,
             clip_behavior=ft.ClipBehavior.ANTI_ALIAS,
             on_click=self._handle_click,
-            animate=ft.Animation(200, ft.AnimationCurve.EASE_OUT),
-            shadow=ft.BoxShadow(
-                spread_radius=0,
-                blur_radius=8,
-                color=ft.Colors.with_opacity(0.3, ft.Colors.BLACK),
-                offset=ft.Offset(0, 2),
-            ),
+            animate=_ANIMATION,
+            shadow=_SHADOW,
             on_hover=self._handle_hover,
         )
+        self.bind(work)
+
+    def bind(self, work: Work) -> "WorkCard":
+        """换绑到另一个作品，只改动文本、颜色和封面地址。"""
+        self.work = work
+        # 封面图（有缓存时用本地文件，未缓存先显示占位，下载完再换上）
+        if self._cover_cache:
+            self._set_cover(self._cover_cache.src(
+                work.id, "sam", on_ready=lambda src, w=work: self._cover_ready(w, src)
+            ))
+        else:
+            self._set_cover(self._api.cover_url(work.id, "sam") if self._api else None)
+        self._title.value = work.title
+        self._circle.value = work.circle.name
+        color = _rate_color(work.rate)
+        self._star.color = color
+        self._rate.value = f"{work.rate}"
+        self._rate.color = color
+        self._dl_count.value = f"{work.dl_count}"
+        # 回收前可能停在悬停状态
+        self.scale = 1.0
+        self.shadow = _SHADOW
+        return self
+
+    def _set_cover(self, src: Optional[str]):
+        self._cover.src = src or ""
+        self._cover.visible = bool(src)
+
+    def _cover_ready(self, work: Work, src: str):
+        # 下载期间卡片可能已被回收换绑到别的作品
+        if self.work is work:
+            self._set_cover(src)
+            request_update(self._cover)
 
     def _handle_click(self, e):
         if self._on_click:
             self._on_click(self.work)
 
     def _handle_hover(self, e):
-        if e.data == "true":
-            self.scale = 1.03
-            self.shadow = ft.BoxShadow(
-                spread_radius=1,
-                blur_radius=16,
-                color=ft.Colors.with_opacity(0.4, ft.Colors.DEEP_PURPLE),
-                offset=ft.Offset(0, 4),
-            )
-        else:
-            self.scale = 1.0
-            self.shadow = ft.BoxShadow(
-                spread_radius=0,
-                blur_radius=8,
-                color=ft.Colors.with_opacity(0.3, ft.Colors.BLACK),
-                offset=ft.Offset(0, 2),
-            )
-        self.update()
+        hovered = e.data == "true"
+        self.scale = 1.03 if hovered else 1.0
+        self.shadow = _HOVER_SHADOW if hovered else _SHADOW
+        request_update(self)
+
+
+class CardPool:
+    """
+    WorkCard 工厂与回收池。
+    离开视口或网格被清空时卡片放回池中，需要新卡片时优先取出旧卡片换绑作品，
+    避免每次重新构建十几个控件。
+    """
+
+    def __init__(self, on_click=None, cover_cache=None, api: Optional[AsmrApi] = None,
+                 max_size: int = 128):
+        self._on_click = on_click
+        self._cover_cache = cover_cache
+        self._api = api
+        self.max_size = max_size
+        self._free: list = []
+
+    def __len__(self) -> int:
+        return len(self._free)
+
+    def acquire(self, work: Work) -> WorkCard:
+        if self._free:
+            return self._free.pop().bind(work)
+        return WorkCard(work, on_click=self._on_click, cover_cache=self._cover_cache,
+                        api=self._api)
+
+    def release(self, card: WorkCard):
+        """放回池中。调用方需先把卡片从控件树中移除。"""
+        if len(self._free) < self.max_size:
+            self._free.append(card)
@@ -0,0 +1,193 @@
+"""
+虚拟化作品网格
+只为视口附近的作品创建 WorkCard，其余位置用轻量占位块代替；
+移出视口或清空网格的卡片回收到 CardPool，之后换绑新作品复用。
+滚动到底部附近时触发加载下一页（无限滚动）。
+"""
+
+import inspect
+import math
+from typing import Optional
+
+import flet as ft
+from components.work_card import CardPool, WorkCard
+from services.models import Work
+from services.ui_updates import request_update
+
+
+class WorkGrid(ft.GridView):
+    """作品网格 — 窗口化渲染 + 无限滚动"""
+
+    def __init__(self, on_work_click=None, cover_cache=None, on_end_reached=None,
+                 window_margin: int = 16, load_threshold: float = 800,
+                 pool: Optional[CardPool] = None, api=None):
+        """
+        参数:
+            on_work_click: 点击作品回调
+            cover_cache: 封面缓存（可选）
+            on_end_reached: 滚动接近底部时的回调（可为 async）
+            window_margin: 视口上下各额外保留的卡片数
+            load_threshold: 距离底部多少像素时触发加载
+            pool: 卡片回收池，多个网格可共用一个（默认各自新建）
+            api: 没有封面缓存时用来生成封面地址
+        """
+        super().__init__(
+            runs_count=2,
+            max_extent=220,
+            child_aspect_ratio=0.62,
+            spacing=12,
+            run_spacing=12,
+            expand=True,
+            # 底部留出播放条的位置
+            padding=ft.padding.only(left=16, right=16, top=8, bottom=100),
+            on_scroll=self._on_scroll,
+            scroll_interval=100,
+        )
+        self._pool = pool or CardPool(on_click=on_work_click, cover_cache=cover_cache, api=api)
+        self._on_end_reached = on_end_reached
+        self.window_margin = window_margin
+        self.load_threshold = load_threshold
+
+        # 每个位置的数据：作品 Work，或直接显示的控件（提示信息等）
+        self._items: list = []
+        # 当前已创建 WorkCard 的下标区间 [start, end)
+        self._window = (0, 0)
+        self._offset = 0.0
+        # 当前显示的加载失败提示（带重试按钮），同一时间最多一条
+        self._error: Optional[ft.Control] = None
+
+    # ── 数据 ──────────────────────────────────────────
+
+    @property
+    def work_count(self) -> int:
+        return sum(1 for it in self._items if isinstance(it, Work))
+
+    @property
+    def works(self) -> list:
+        return [it for it in self._items if isinstance(it, Work)]
+
+    @property
+    def has_messages(self) -> bool:
+        """是否含有提示信息（错误、无结果等）"""
+        return self.work_count != len(self._items)
+
+    def add_works(self, works: list):
+        """追加一批作品；落在当前窗口内的直接创建卡片。"""
+        if not self._items:
+            # 首屏：窗口从头开始
+            self._window = (0, 2 * self.window_margin)
+        start, end = self._window
+        for w in works:
+            idx = len(self._items)
+            self._items.append(w)
+            self.controls.append(
+                self._make_card(w) if start <= idx < end else self._make_placeholder()
+            )
+
+    def add_message(self, control: ft.Control):
+        """追加一条提示（错误、无结果等），不参与虚拟化。"""
+        self._items.append(control)
+        self.controls.append(control)
+
+    def add_error(self, message: str, on_retry) -> ft.Control:
+        """
+        追加一条带“重试”按钮的加载失败提示（替换之前的那条）。
+        on_retry 可为 async；开始新的加载时调用 clear_error 移除提示。
+        """
+        async def retry(e):
+            result = on_retry()
+            if inspect.isawaitable(result):
+                await result
+
+        self.clear_error()
+        self._error = ft.Container(
+            content=ft.Column(
+                controls=[
+                    ft.Text(message, color=ft.Colors.RED_300),
+                    ft.TextButton("重试", icon=ft.Icons.REFRESH_ROUNDED, on_click=retry),
+                ],
+                tight=True,
+            ),
+            padding=20,
+        )
+        self.add_message(self._error)
+        return self._error
+
+    def clear_error(self):
+        """移除加载失败提示（提示总在末尾，不影响作品的位置）。"""
+        if self._error is None:
+            return
+        idx = next((i for i, it in enumerate(self._items) if it is self._error), None)
+        if idx is not None:
+            del self._items[idx]
+            del self.controls[idx]
+        self._error = None
+
+    def clear(self):
+        for control in self.controls:
+            self._recycle(control)
+        self._items.clear()
+        self.controls.clear()
+        self._window = (0, 0)
+        self._offset = 0.0
+        self._error = None
+
+    # ── 窗口化 ────────────────────────────────────────
+
+    def _make_card(self, work: Work) -> ft.Control:
+        return self._pool.acquire(work)
+
+    def _recycle(self, control: ft.Control):
+        if isinstance(control, WorkCard):
+            self._pool.release(control)
+
+    @staticmethod
+    def _make_placeholder() -> ft.Control:
+        # GridView 的格子尺寸固定，占位块与卡片占据相同空间，滚动位置不受影响
+        return ft.Container(
+            border_radius=12,
+            bgcolor=ft.Colors.with_opacity(0.06, ft.Colors.WHITE),
+        )
+
+    def _set_window(self, start: int, end: int) -> bool:
+        """把 [start, end) 内的作品实体化，其余替换为占位块。返回是否有变化。"""
+        # end 不截断到数据长度，之后追加的作品若落在窗口内会直接创建卡片
+        start = max(0, start)
+        old_start, old_end = self._window
+        if (start, end) == (old_start, old_end):
+            return False
+
+        n = len(self._items)
+        changed = False
+        for idx in range(old_start, min(old_end, n)):
+            if not (start <= idx < end) and isinstance(self._items[idx], Work):
+                self._recycle(self.controls[idx])
+                self.controls[idx] = self._make_placeholder()
+                changed = True
+        for idx in range(start, min(end, n)):
+            if not (old_start <= idx < old_end) and isinstance(self._items[idx], Work):
+                self.controls[idx] = self._make_card(self._items[idx])
+                changed = True
+        self._window = (start, end)
+        return changed
+
+    async def _on_scroll(self, e: ft.OnScrollEvent):
+        self._offset = e.pixels
+        content = e.max_scroll_extent + e.viewport_dimension
+        n = len(self._items)
+        if n and content > 0:
+            # 格子尺寸统一，按像素比例估算可见下标
+            first = math.floor(e.pixels / content * n)
+            last = math.ceil((e.pixels + e.viewport_dimension) / content * n)
+            if self._set_window(first - self.window_margin, last + self.window_margin):
+                request_update(self)
+
+        if self._on_end_reached and e.max_scroll_extent - e.pixels < self.load_threshold:
+            result = self._on_end_reached()
+            if inspect.isawaitable(result):
+                await result
+
+    def did_mount(self):
+        # 切回页面时恢复滚动位置
+        if self._offset > 0:
+            self.page.run_task(self.scroll_to, offset=self._offset)
@@ -0,0 +1 @@
+# 让 tests/ 下的测试能直接导入项目根目录的模块
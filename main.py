@@ -1,13 +1,30 @@
 """
 ASMR GUI 应用入口
 基于 Flet 框架，跨平台运行（桌面 + Android）。
+
+启动时只导入和创建首屏需要的部分：首页先渲染本地快照，网络数据在后台刷新；
+搜索页、详情页、播放器、下载和音频代理在第一次用到时才导入和创建。
 """
 
+import time
+
+# 尽早记录启动时间，用于统计首屏耗时
+_STARTED = time.perf_counter()
+
+import asyncio
+
 import flet as ft
+from asmr_api import AsmrApi
+from services.response_cache import ResponseCache
+from services.cover_cache import CoverCache
+from services.search_index import SearchIndex
+from services.catalog import CatalogStore, CatalogSync
+from services.snapshot import Snapshot
+from services.storage import data_dir
+from services.ui_updates import UpdateScheduler
+from services.metrics import Metrics
+from services.models import Work
 from pages.home_page import HomePage
-from pages.search_page import SearchPage
-from pages.detail_page import DetailPage
-from components.audio_player import AudioPlayer
 from components.nav_bar import NavBar
 
 
@@ -29,21 +46,106 @@ async def main(page: ft.Page):
     page.window.height = 800
 
     # ── 全局组件 ──────────────────────────────────────
-    try:
-        audio_player = AudioPlayer()
-    except Exception as e:
-        print(f"AudioPlayer init failed: {e}")
-        import traceback
-        traceback.print_exc()
-        audio_player = ft.Container() # Fallback
+    # 请求与界面刷新的性能统计（导航栏连续快速点击可查看）
+    metrics = Metrics()
+    # 高频界面刷新合并后按帧率上限发出
+    ui_updates = UpdateScheduler(page, metrics=metrics).start()
+    # 整个应用共享一个 API 会话，复用连接池（keep-alive / HTTP/2）
+    response_cache = ResponseCache()
+    search_index = SearchIndex()
+    api = await AsmrApi(cache=response_cache, index=search_index, metrics=metrics).start()
+    cover_cache = CoverCache(api)
+    catalog = CatalogStore()
+    catalog_job = None
+
+    # 首屏之后才需要的组件，第一次用到时创建
+    deferred = {}
+    # 连点作品卡片会并发打开两个详情页：创建过程串行，避免重复创建
+    deferred_lock = asyncio.Lock()
+
+    async def get_audio_player():
+        async with deferred_lock:
+            if "audio_player" not in deferred:
+                from components.audio_player import AudioPlayer
+                from services.audio_proxy import AudioCacheProxy
+                audio_proxy = AudioCacheProxy()
+                await audio_proxy.start()
+                deferred["audio_proxy"] = audio_proxy
+                try:
+                    audio_player = AudioPlayer(proxy=audio_proxy)
+                except Exception as e:
+                    print(f"AudioPlayer init failed: {e}")
+                    import traceback
+                    traceback.print_exc()
+                    audio_player = ft.Container() # Fallback
+                deferred["audio_player"] = audio_player
+                player_slot.content = audio_player
+        return deferred["audio_player"]
+
+    def on_download_failed(job, error: str):
+        page.show_dialog(ft.SnackBar(
+            ft.Text(f"下载失败：{job.path}（{error}）"),
+            bgcolor=ft.Colors.RED_900,
+        ))
+
+    async def get_downloads():
+        async with deferred_lock:
+            if "downloads" not in deferred:
+                from services.downloads import DownloadManager
+                downloads = DownloadManager(on_failed=on_download_failed)
+                await downloads.start()
+                deferred["downloads"] = downloads
+        return deferred["downloads"]
+
+    def get_search_page():
+        if "search_page" not in deferred:
+            from pages.search_page import SearchPage
+            from services.dictionaries import Dictionaries
+            dictionaries = Dictionaries(api)
+            page.run_task(dictionaries.load)
+            deferred["search_page"] = SearchPage(
+                api,
+                on_work_click=open_detail,
+                cover_cache=cover_cache,
+                search_index=search_index,
+                dictionaries=dictionaries,
+            )
+        return deferred["search_page"]
+
+    async def on_close(e):
+        ui_updates.stop()
+        try:
+            metrics.export()
+        except Exception as ex:
+            print(f"Export metrics failed: {ex}")
+        if catalog_job:
+            catalog_job.cancel()
+        cover_cache.close()
+        if "downloads" in deferred:
+            await deferred["downloads"].aclose()
+        if "audio_proxy" in deferred:
+            await deferred["audio_proxy"].aclose()
+        await api.aclose()
+        response_cache.close()
+        search_index.close()
+        catalog.close()
+
+    page.on_close = on_close
 
     # ── 页面实例 ──────────────────────────────────────
-    def open_detail(work: dict):
+    def open_detail(work: Work):
         """打开作品详情页"""
+        page.run_task(_open_detail, work)
+
+    async def _open_detail(work: Work):
+        from pages.detail_page import DetailPage
         detail = DetailPage(
             work=work,
-            audio_player=audio_player,
+            api=api,
+            audio_player=await get_audio_player(),
             on_back=show_main,
+            cover_cache=cover_cache,
+            downloads=await get_downloads(),
         )
         content_area.controls.clear()
         content_area.controls.append(detail)
@@ -51,18 +153,31 @@ async def main(page: ft.Page):
         page.update()
         page.run_task(detail.load_tracks, page)
 
+    def open_perf():
+        """打开隐藏的性能面板"""
+        from components.perf_panel import PerfPanel
+        content_area.controls.clear()
+        content_area.controls.append(PerfPanel(metrics, on_back=show_main))
+        nav_bar.visible = False
+        page.update()
+
     def show_main():
         """返回主页面"""
         content_area.controls.clear()
         if current_tab[0] == 0:
             content_area.controls.append(home_page)
         else:
-            content_area.controls.append(search_page)
+            content_area.controls.append(get_search_page())
         nav_bar.visible = True
         page.update()
 
-    home_page = HomePage(on_work_click=open_detail)
-    search_page = SearchPage(on_work_click=open_detail)
+    home_page = HomePage(
+        api,
+        on_work_click=open_detail,
+        cover_cache=cover_cache,
+        catalog=catalog,
+        snapshot=Snapshot(data_dir() / "home_snapshot.json"),
+    )
 
     current_tab = [0]
 
@@ -74,11 +189,11 @@ async def main(page: ft.Page):
         if idx == 0:
             content_area.controls.append(home_page)
         else:
-            content_area.controls.append(search_page)
+            content_area.controls.append(get_search_page())
         page.update()
 
     try:
-        nav_bar = NavBar(on_change=on_nav_change)
+        nav_bar = NavBar(on_change=on_nav_change, on_hidden=open_perf)
     except Exception as e:
         print(f"NavBar init failed: {e}")
         import traceback
@@ -92,28 +207,51 @@ async def main(page: ft.Page):
         spacing=0,
     )
 
+    # 底部播放器的位置（浮在 nav_bar 上方），第一次打开详情页时放入播放器
+    player_slot = ft.Container(
+        bottom=80,
+        left=0,
+        right=0,
+    )
+
     # ── 整体布局 ──────────────────────────────────────
     try:
+        # 有快照时首屏不等网络
+        from_snapshot = home_page.show_snapshot()
         page.add(
             ft.Stack(
                 controls=[
                     # 主内容
                     content_area,
-                    # 底部播放器（浮在 nav_bar 上方）
-                    ft.Container(
-                        content=audio_player,
-                        bottom=80,
-                        left=0,
-                        right=0,
-                    ),
+                    player_slot,
                 ],
                 expand=True,
             ),
         )
         page.navigation_bar = nav_bar
+        page.update()
+        if from_snapshot:
+            metrics.observe("startup_interactive", time.perf_counter() - _STARTED)
+
+        # ── 后台任务 ──────────────────────────────────────
+        cover_cache.load()
+
+        async def purge_cache():
+            await asyncio.to_thread(response_cache.purge)
+
+        page.run_task(purge_cache)
 
         # ── 初始加载 ──────────────────────────────────────
         await home_page.load_data()
+        metrics.observe("startup_first_page", time.perf_counter() - _STARTED)
+        if not from_snapshot:
+            metrics.observe("startup_interactive", time.perf_counter() - _STARTED)
+
+        # 本地目录：首页加载完后在后台低速爬取全量（跨会话续爬），
+        # 完整后定期增量同步
+        catalog_job = page.run_task(
+            CatalogSync(api, catalog, workers=1, rate=0.5).run_periodic
+        )
     except Exception as e:
         page.clean()
         page.add(
@@ -1,31 +1,60 @@
 """
 作品详情页
 展示作品详细信息和音轨列表，支持音频播放。
+音轨树按需构建：文件夹默认折叠，展开时才生成子行，所有行放在虚拟化列表中。
+点击某个音轨后，按文件夹顺序连续播放后面的音频。
 """
 
+import contextlib
+
 import flet as ft
 from asmr_api import AsmrApi
+from components.work_card import COVER_FIT
+from services.downloads import track_url
+from services.models import Track, Work
+from services.play_queue import PlayQueue, build_queue, is_audio
+from services.ui_updates import request_update
 
 
 class DetailPage(ft.Column):
     """作品详情页"""
 
-    def __init__(self, work: dict, audio_player, on_back=None):
-        super().__init__(expand=True, scroll=ft.ScrollMode.AUTO, spacing=0)
+    def __init__(self, work: Work, api: AsmrApi, audio_player, on_back=None,
+                 cover_cache=None, downloads=None):
+        super().__init__(expand=True, spacing=0)
         self.work = work
+        self._api = api
+        self._downloads = downloads
         self.audio_player = audio_player
         self._on_back = on_back
         self._tracks = []
+        self._queue_items = []  # 按文件夹顺序展开的可播放音轨
 
-        work_id = work.get("id", 0)
-        title = work.get("title", "未知作品")
-        circle_name = work.get("circle", {}).get("name", "")
-        rate = work.get("rate_average_2dp", 0)
-        dl_count = work.get("dl_count", 0)
-        price = work.get("price", 0)
-        tags = work.get("tags", [])
+        work_id = work.id
+        title = work.title
+        circle_name = work.circle.name
+        rate = work.rate
+        dl_count = work.dl_count
+        price = work.price
+        tags = work.tags
 
-        cover_url = f"https://api.asmr-200.com/api/cover/{work_id}.jpg?type=main"
+        # 未缓存时先显示占位，下载完成后换上本地文件
+        cover_url = (
+            cover_cache.src(work_id, "main", on_ready=self._cover_ready) if cover_cache
+            else api.cover_url(work_id, "main")
+        )
+
+        self.cover = ft.Image(
+            src=cover_url or "",
+            visible=bool(cover_url),
+            fit=COVER_FIT,
+            border_radius=16,
+            error_content=ft.Container(
+                content=ft.Icon(ft.Icons.IMAGE_NOT_SUPPORTED, size=60, color=ft.Colors.GREY_400),
+                alignment=ft.Alignment(0, 0),
+                height=250,
+            ),
+        )
 
         # 评分颜色
         rate_color = (
@@ -37,19 +66,16 @@ class DetailPage(ft.Column):
         # 标签
         tag_chips = []
         for t in tags[:10]:
-            tag_name = t.get("name", "") if isinstance(t, dict) else str(t)
-            if tag_name:
+            if t.name:
                 tag_chips.append(
                     ft.Container(
-                        content=ft.Text(tag_name, size=11, color=ft.Colors.DEEP_PURPLE_ACCENT_100),
+                        content=ft.Text(t.name, size=11, color=ft.Colors.DEEP_PURPLE_ACCENT_100),
                         padding=ft.padding.symmetric(horizontal=10, vertical=4),
                         border_radius=12,
                         bgcolor=ft.Colors.with_opacity(0.15, ft.Colors.DEEP_PURPLE),
                     )
                 )
 
-        # 音轨列表容器
-        self.tracks_column = ft.Column(spacing=2)
         self.tracks_loading = ft.Container(
             content=ft.ProgressRing(width=24, height=24, color=ft.Colors.DEEP_PURPLE_ACCENT_100),
             alignment=ft.Alignment(0, 0),
@@ -63,8 +89,28 @@ class DetailPage(ft.Column):
             on_click=self._go_back,
         )
 
-        # 构建页面
-        self.controls = [
+        # 整个页面是一个虚拟化列表：头部信息之后接音轨行，
+        # 只有屏幕内的行会被渲染，折叠的文件夹不构建子行
+        # 下载失败的文件（可重试）
+        self.failed_text = ft.Text(size=13, color=ft.Colors.RED_300, expand=True)
+        self.failed_row = ft.Container(
+            content=ft.Row(
+                controls=[
+                    ft.Icon(ft.Icons.ERROR_OUTLINE_ROUNDED, size=16, color=ft.Colors.RED_300),
+                    self.failed_text,
+                    ft.TextButton("重试", on_click=self._retry_failed),
+                ],
+            ),
+            padding=ft.padding.only(left=20, right=8),
+            visible=False,
+        )
+
+        self.list_view = ft.ListView(
+            expand=True,
+            spacing=0,
+            padding=ft.padding.only(bottom=100),
+        )
+        self.list_view.controls = [
             # 顶部返回栏
             ft.Container(
                 content=ft.Row(
@@ -83,16 +129,8 @@ class DetailPage(ft.Column):
             ),
             # 封面区域
             ft.Container(
-                content=ft.Image(
-                    src=cover_url,
-                    fit=ft.ImageFit.COVER,
-                    border_radius=16,
-                    error_content=ft.Container(
-                        content=ft.Icon(ft.Icons.IMAGE_NOT_SUPPORTED, size=60, color=ft.Colors.GREY_400),
-                        alignment=ft.Alignment(0, 0),
-                        height=250,
-                    ),
-                ),
+                content=self.cover,
+                bgcolor=ft.Colors.with_opacity(0.15, ft.Colors.WHITE),  # 封面加载前的占位
                 height=250,
                 width=float("inf"),
                 clip_behavior=ft.ClipBehavior.ANTI_ALIAS,
@@ -146,120 +184,237 @@ class DetailPage(ft.Column):
             ),
             # 音轨列表标题
             ft.Container(
-                content=ft.Text(
-                    "🎵 音轨列表",
-                    size=16,
-                    weight=ft.FontWeight.W_600,
-                    color=ft.Colors.WHITE,
+                content=ft.Row(
+                    controls=[
+                        ft.Text(
+                            "🎵 音轨列表",
+                            size=16,
+                            weight=ft.FontWeight.W_600,
+                            color=ft.Colors.WHITE,
+                            expand=True,
+                        ),
+                        ft.IconButton(
+                            icon=ft.Icons.DOWNLOAD_FOR_OFFLINE_ROUNDED,
+                            icon_size=20,
+                            icon_color=ft.Colors.DEEP_PURPLE_ACCENT_100,
+                            tooltip="下载全部",
+                            on_click=lambda e: self._download(self._tracks, ""),
+                            visible=downloads is not None,
+                        ),
+                    ],
                 ),
-                padding=ft.padding.only(left=20, top=16, bottom=8),
+                padding=ft.padding.only(left=20, right=8, top=16, bottom=8),
             ),
+            self.failed_row,
             self.tracks_loading,
-            ft.Container(
-                content=self.tracks_column,
-                padding=ft.padding.only(left=12, right=12, bottom=100),
-            ),
         ]
+        self.controls = [self.list_view]
 
     async def load_tracks(self, page: ft.Page):
-        """加载音轨列表"""
-        work_id = self.work.get("id", 0)
+        """加载音轨列表（流式：每收到一个顶层条目就先显示出来）"""
+        tracks: list = []
+        self._tracks = tracks
         try:
-            async with AsmrApi() as api:
-                tracks = await api.get_tracks(work_id)
-            self._tracks = tracks
-            self._build_track_list(tracks, page)
+            # 中途离开详情页时及时关闭流，释放连接
+            async with contextlib.aclosing(self._api.iter_tracks(self.work.id)) as stream:
+                async for track in stream:
+                    tracks.append(track)
+                    self._build_track_list([track], page)
+                    request_update(self.list_view)
+            self._queue_items = build_queue(tracks)
+            self._expand_single_folder(tracks)
         except Exception as e:
-            self.tracks_column.controls.append(
-                ft.Text(f"加载音轨失败: {e}", color=ft.Colors.RED_300)
+            self.list_view.controls.append(
+                ft.Container(
+                    content=ft.Text(f"加载音轨失败: {e}", color=ft.Colors.RED_300),
+                    padding=ft.padding.symmetric(horizontal=20),
+                )
             )
         finally:
             self.tracks_loading.visible = False
-            self.update()
+            self._refresh_failed()
+            request_update(self)
 
-    def _build_track_list(self, items: list, page: ft.Page, depth: int = 0):
-        """递归构建音轨列表（支持文件夹嵌套）"""
-        for item in items:
-            item_type = item.get("type", "")
-            title = item.get("title", "未知")
+    def _build_track_list(self, items: list, page: ft.Page):
+        """构建顶层音轨行，追加到列表末尾"""
+        self.list_view.controls.extend(self._build_rows(items, page, 0, ""))
 
-            if item_type == "folder":
-                # 文件夹
-                self.tracks_column.controls.append(
-                    ft.Container(
-                        content=ft.Row(
-                            controls=[
-                                ft.Icon(ft.Icons.FOLDER_ROUNDED, size=18, color=ft.Colors.AMBER),
-                                ft.Text(
-                                    title, size=13,
-                                    weight=ft.FontWeight.W_600,
-                                    color=ft.Colors.WHITE70,
-                                ),
-                            ],
-                            spacing=8,
-                        ),
-                        padding=ft.padding.only(left=20 + depth * 16, top=8, bottom=4),
-                    )
-                )
-                children = item.get("children", [])
-                if children:
-                    self._build_track_list(children, page, depth + 1)
+    def _expand_single_folder(self, items: list):
+        """文件夹默认折叠，只有一个顶层文件夹时自动展开（它的行在列表末尾）。"""
+        if len(items) == 1 and items[0].is_folder:
+            self._toggle_folder(self.list_view.controls[-1])
+
+    def _build_rows(self, items: list, page: ft.Page, depth: int, prefix: str) -> list:
+        """只构建这一层的行，子文件夹的内容等展开时再构建"""
+        rows = []
+        for item in items:
+            if item.is_folder:
+                rows.append(self._folder_row(item, page, depth, prefix))
             else:
-                # 音频文件
-                media_url = item.get("mediaStreamUrl", "") or item.get("mediaDownloadUrl", "")
-                duration_text = ""
-                duration = item.get("duration", 0)
-                if duration:
-                    m, s = divmod(int(duration), 60)
-                    duration_text = f"{m}:{s:02d}"
+                rows.append(self._file_row(item, page, depth))
+        return rows
 
-                is_audio = any(
-                    title.lower().endswith(ext)
-                    for ext in (".mp3", ".wav", ".flac", ".m4a", ".ogg", ".aac")
-                )
+    def _folder_row(self, item: Track, page: ft.Page, depth: int, prefix: str) -> ft.Container:
+        title = item.title
+        children = item.children
+        folder_path = f"{prefix}{title}/"
+        chevron = ft.Icon(ft.Icons.CHEVRON_RIGHT_ROUNDED, size=18, color=ft.Colors.WHITE38)
+        return ft.Container(
+            content=ft.Row(
+                controls=[
+                    chevron,
+                    ft.Icon(ft.Icons.FOLDER_ROUNDED, size=18, color=ft.Colors.AMBER),
+                    ft.Text(
+                        title, size=13,
+                        weight=ft.FontWeight.W_600,
+                        color=ft.Colors.WHITE70,
+                        expand=True,
+                    ),
+                    ft.Text(f"{len(children)}", size=11, color=ft.Colors.WHITE38),
+                    ft.IconButton(
+                        icon=ft.Icons.DOWNLOAD_ROUNDED,
+                        icon_size=18,
+                        icon_color=ft.Colors.WHITE38,
+                        tooltip="下载此文件夹",
+                        on_click=lambda e, c=children, p=folder_path: self._download(c, p),
+                        visible=self._downloads is not None,
+                    ),
+                ],
+                spacing=8,
+            ),
+            padding=ft.padding.only(left=8 + depth * 16, right=8, top=4, bottom=4),
+            margin=ft.margin.symmetric(horizontal=12),
+            border_radius=8,
+            on_click=lambda e: self._toggle_folder(e.control),
+            on_hover=self._track_hover,
+            data={
+                "depth": depth,
+                "children": children,
+                "prefix": folder_path,
+                "page": page,
+                "chevron": chevron,
+                "expanded": False,
+            },
+        )
+
+    def _file_row(self, item: Track, page: ft.Page, depth: int) -> ft.Container:
+        title = item.title
+        duration_text = ""
+        duration = item.duration
+        if duration:
+            m, s = divmod(int(duration), 60)
+            duration_text = f"{m}:{s:02d}"
 
-                icon = ft.Icons.AUDIOTRACK_ROUNDED if is_audio else ft.Icons.INSERT_DRIVE_FILE_ROUNDED
-                icon_color = ft.Colors.DEEP_PURPLE_ACCENT_100 if is_audio else ft.Colors.WHITE38
+        audio = is_audio(title)
+        icon = ft.Icons.AUDIOTRACK_ROUNDED if audio else ft.Icons.INSERT_DRIVE_FILE_ROUNDED
+        icon_color = ft.Colors.DEEP_PURPLE_ACCENT_100 if audio else ft.Colors.WHITE38
 
-                row = ft.Container(
-                    content=ft.Row(
-                        controls=[
-                            ft.Icon(icon, size=18, color=icon_color),
-                            ft.Text(
-                                title, size=13,
-                                color=ft.Colors.WHITE,
-                                expand=True,
-                                max_lines=1,
-                                overflow=ft.TextOverflow.ELLIPSIS,
-                            ),
-                            ft.Text(duration_text, size=11, color=ft.Colors.WHITE38),
-                            ft.IconButton(
-                                icon=ft.Icons.PLAY_ARROW_ROUNDED,
-                                icon_size=20,
-                                icon_color=ft.Colors.DEEP_PURPLE_ACCENT_100,
-                                on_click=lambda e, u=media_url, t=title: self._play_track(u, t, page),
-                                visible=bool(media_url and is_audio),
-                            ),
-                        ],
-                        spacing=6,
-                        vertical_alignment=ft.CrossAxisAlignment.CENTER,
+        return ft.Container(
+            content=ft.Row(
+                controls=[
+                    ft.Icon(icon, size=18, color=icon_color),
+                    ft.Text(
+                        title, size=13,
+                        color=ft.Colors.WHITE,
+                        expand=True,
+                        max_lines=1,
+                        overflow=ft.TextOverflow.ELLIPSIS,
                     ),
-                    padding=ft.padding.only(left=20 + depth * 16, right=8, top=2, bottom=2),
-                    border_radius=8,
-                    on_hover=lambda e, c=None: self._track_hover(e),
-                )
-                self.tracks_column.controls.append(row)
+                    ft.Text(duration_text, size=11, color=ft.Colors.WHITE38),
+                    ft.IconButton(
+                        icon=ft.Icons.PLAY_ARROW_ROUNDED,
+                        icon_size=20,
+                        icon_color=ft.Colors.DEEP_PURPLE_ACCENT_100,
+                        on_click=lambda e, t=item: self._play_track(t, page),
+                        visible=bool((item.stream_url or item.download_url) and audio),
+                    ),
+                ],
+                spacing=6,
+                vertical_alignment=ft.CrossAxisAlignment.CENTER,
+            ),
+            padding=ft.padding.only(left=34 + depth * 16, right=8, top=2, bottom=2),
+            margin=ft.margin.symmetric(horizontal=12),
+            border_radius=8,
+            on_hover=self._track_hover,
+            data={"depth": depth},
+        )
+
+    def _toggle_folder(self, row: ft.Container):
+        """展开时在文件夹行后插入子行，折叠时移除其下所有层级的行"""
+        info = row.data
+        controls = self.list_view.controls
+        # 按身份查找：控件是 dataclass，list.index 会逐个比较全部字段
+        start = next(i for i, c in enumerate(controls) if c is row) + 1
+        if info["expanded"]:
+            end = start
+            while end < len(controls) and isinstance(controls[end].data, dict) \
+                    and controls[end].data["depth"] > info["depth"]:
+                end += 1
+            del controls[start:end]
+        else:
+            controls[start:start] = self._build_rows(
+                info["children"], info["page"], info["depth"] + 1, info["prefix"]
+            )
+        info["expanded"] = not info["expanded"]
+        info["chevron"].name = (
+            ft.Icons.EXPAND_MORE_ROUNDED if info["expanded"] else ft.Icons.CHEVRON_RIGHT_ROUNDED
+        )
+        request_update(self.list_view)
+
+    def _cover_ready(self, src: str):
+        self.cover.src = src
+        self.cover.visible = True
+        request_update(self.cover)
+
+    def _track_src(self, item: Track) -> str:
+        """音轨的播放地址（已下载的优先播放本地文件）"""
+        local_path = (
+            self._downloads.local_path(track_url(item)) if self._downloads else None
+        )
+        return local_path or item.stream_url or item.download_url
+
+    def _download(self, items: list, prefix: str):
+        """把一组音轨（整个作品或一个文件夹）加入下载队列"""
+        if self._downloads is None or not items:
+            return
+        count = self._downloads.enqueue_tracks(self.work.id, items, prefix)
+        self._refresh_failed()
+        self.page.show_dialog(ft.SnackBar(
+            ft.Text(f"已加入下载队列：{count} 个文件" if count else "这些文件已在下载队列中")
+        ))
+
+    def _refresh_failed(self):
+        """显示本作品下载失败的文件数"""
+        failed = self._downloads.failed_jobs(self.work.id) if self._downloads else []
+        if failed:
+            self.failed_text.value = f"{len(failed)} 个文件下载失败：{failed[-1].error or '未知错误'}"
+        self.failed_row.visible = bool(failed)
+        request_update(self.failed_row)
+
+    def _retry_failed(self, e):
+        if self._downloads is None:
+            return
+        count = self._downloads.retry_failed(self.work.id)
+        self._refresh_failed()
+        self.page.show_dialog(ft.SnackBar(ft.Text(f"已重新加入下载队列：{count} 个文件")))
 
-    def _play_track(self, url: str, title: str, page: ft.Page):
-        if url and hasattr(self.audio_player, "play"):
-            self.audio_player.play(url, title, page)
+    def _play_track(self, track: Track, page: ft.Page):
+        # 播放地址此时才解析（已下载的查本地文件）
+        queue = PlayQueue(self._queue_items, resolve=self._track_src)
+        queue.index = queue.index_of(track)
+        if queue.index >= 0 and hasattr(self.audio_player, "play_queue"):
+            self.audio_player.play_queue(queue, page)
+        elif hasattr(self.audio_player, "play"):
+            url = self._track_src(track)
+            if url:
+                self.audio_player.play(url, track.title, page)
 
     def _track_hover(self, e):
         e.control.bgcolor = (
             ft.Colors.with_opacity(0.08, ft.Colors.WHITE)
             if e.data == "true" else None
         )
-        e.control.update()
+        request_update(e.control)
 
     def _go_back(self, e):
         if self._on_back:
@@ -1,11 +1,32 @@
 """
 首页 — 发现
 展示最新/热门 ASMR 作品的网格列表，支持排序切换和分页加载。
+启动时先渲染上次保存的首屏快照，网络结果返回后再替换。
+切换排序时，离开的排序连同已加载的页、卡片和滚动位置保留在有界缓存中，
+切回时立即恢复并在后台确认第一页是否有变化（随机推荐不缓存）。
 """
 
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
 import flet as ft
 from asmr_api import AsmrApi
-from components.work_card import WorkCard
+from components.work_card import CardPool
+from components.work_grid import WorkGrid
+from services.models import Work
+from services.prefetch import PagePrefetcher
+from services.ui_updates import request_update
+
+
+@dataclass
+class _OrderView:
+    """某个排序下已加载的内容"""
+
+    grid: WorkGrid  # 含作品、已建好的卡片和滚动位置
+    page_num: int   # 已加载到第几页
+    has_more: bool
 
 
 class HomePage(ft.Column):
@@ -19,13 +40,30 @@ class HomePage(ft.Column):
         "评论最多": "review_count",
         "随机推荐": "random",
     }
+    # 每次结果都不同的排序，切走时直接丢弃
+    UNCACHEABLE = {"random"}
+    # 最多保留几个切走的排序
+    MAX_CACHED_ORDERS = 3
 
-    def __init__(self, on_work_click=None):
+    def __init__(self, api: AsmrApi, on_work_click=None, cover_cache=None, catalog=None,
+                 snapshot=None):
         super().__init__(expand=True, spacing=0)
+        self._api = api
+        self._catalog = catalog
+        self._cover_cache = cover_cache
         self._on_work_click = on_work_click
         self._page_num = 1
         self._order = "create_date"
         self._loading = False
+        self._has_more = True
+        self._generation = 0  # 排序每变一次 +1，用于丢弃过期结果
+        self._snapshot = snapshot  # 首屏快照（可选）
+        self._showing_snapshot = False  # 网格里是否还是快照内容
+        self._views: OrderedDict[str, _OrderView] = OrderedDict()  # 切走的排序，最近的在后
+        self._prefetcher = PagePrefetcher(
+            self._works_fetcher(self._order),
+            on_prefetched=cover_cache.prefetch_page if cover_cache else None,
+        )
 
         # 排序下拉
         self.order_dropdown = ft.Dropdown(
@@ -36,32 +74,18 @@ class HomePage(ft.Column):
             text_size=13,
             border_color=ft.Colors.WHITE24,
             color=ft.Colors.WHITE,
-            on_change=self._on_order_change,
             content_padding=ft.padding.symmetric(horizontal=12, vertical=4),
         )
+        # Flet 0.80 起下拉框的选择事件改名为 on_select
+        if hasattr(self.order_dropdown, "on_select"):
+            self.order_dropdown.on_select = self._on_order_change
+        else:
+            self.order_dropdown.on_change = self._on_order_change
 
-        # 作品网格容器
-        self.grid = ft.GridView(
-            runs_count=2,
-            max_extent=220,
-            child_aspect_ratio=0.62,
-            spacing=12,
-            run_spacing=12,
-            expand=True,
-            padding=ft.padding.symmetric(horizontal=16, vertical=8),
-        )
-
-        # 加载更多按钮
-        self.load_more_btn = ft.Container(
-            content=ft.TextButton(
-                text="加载更多",
-                icon=ft.Icons.EXPAND_MORE_ROUNDED,
-                on_click=self._load_more,
-                style=ft.ButtonStyle(color=ft.Colors.DEEP_PURPLE_ACCENT_100),
-            ),
-            alignment=ft.Alignment(0, 0),
-            padding=ft.padding.only(bottom=80),
-        )
+        # 作品网格容器（虚拟化，滚动到底部自动加载下一页）
+        # 各排序的网格共用一个卡片回收池
+        self._pool = CardPool(on_click=on_work_click, cover_cache=cover_cache, api=api)
+        self.grid = self._new_grid()
 
         # 加载指示器
         self.loading_ring = ft.Container(
@@ -92,46 +116,171 @@ class HomePage(ft.Column):
             padding=ft.padding.only(left=20, right=16, top=12, bottom=4),
         )
 
-        self.controls = [header, self.grid, self.loading_ring, self.load_more_btn]
+        self.controls = [header, self.grid, self.loading_ring]
+
+    def show_snapshot(self) -> bool:
+        """不等网络，直接渲染上次保存的首屏。返回是否有可用快照。"""
+        data = self._snapshot.load() if self._snapshot else None
+        if not data or data.get("order") != self._order or not data.get("works"):
+            return False
+        self.grid.add_works([Work.from_json(w) for w in data["works"]])
+        self._showing_snapshot = True
+        return True
 
     async def load_data(self):
         """加载作品数据"""
         if self._loading:
             return
         self._loading = True
-        self.loading_ring.visible = True
-        self.update()
+        # 已预取的页或正显示快照时直接渲染，不显示加载圈
+        if not self._prefetcher.ready(self._page_num) and not self._showing_snapshot:
+            self.loading_ring.visible = True
+            request_update(self)
 
+        generation = self._generation
+        self.grid.clear_error()
         try:
-            async with AsmrApi() as api:
-                data = await api.get_works(page=self._page_num, order=self._order)
+            data = await self._prefetcher.get(self._page_num)
+            if generation != self._generation:
+                return
 
             works = data.get("works", [])
+            if self._showing_snapshot:
+                # 用网络结果替换快照
+                self.grid.clear()
+                self._showing_snapshot = False
             if works:
-                for w in works:
-                    card = WorkCard(w, on_click=self._on_work_click)
-                    self.grid.controls.append(card)
-                self.load_more_btn.visible = True
+                self.grid.add_works(works)
+                self._prefetcher.schedule_after(self._page_num)
+                if self._page_num == 1:
+                    await self._save_snapshot(works)
             else:
-                self.load_more_btn.visible = False
+                self._has_more = False
         except Exception as e:
-            self.grid.controls.append(
-                ft.Container(
-                    content=ft.Text(f"加载失败: {e}", color=ft.Colors.RED_300),
-                    padding=20,
-                )
-            )
+            if generation != self._generation:
+                return
+            # 退回失败前的页码，重试（或继续滚动到底部）时重新请求这一页
+            self._page_num -= 1
+            self.grid.add_error(f"加载失败: {e}", on_retry=self._load_more)
         finally:
             self._loading = False
             self.loading_ring.visible = False
-            self.update()
+            request_update(self)
+            # 请求期间条件已变化：丢弃旧结果，按新条件重新加载
+            # （切回的是缓存中的排序时网格已有内容，不需要重新加载）
+            if generation != self._generation and self.grid.work_count == 0:
+                self.page.run_task(self.load_data)
+
+    async def _save_snapshot(self, works: list):
+        if self._snapshot is None or self._order == "random":
+            return
+        try:
+            await asyncio.to_thread(
+                self._snapshot.save,
+                {
+                    "order": self._order,
+                    "saved_at": time.time(),
+                    "works": [w.to_json() for w in works],
+                },
+            )
+        except Exception as e:
+            print(f"Save home snapshot failed: {e}")
+
+    def _works_fetcher(self, order: str, use_cache: bool = True):
+        """
+        绑定排序方式的分页请求函数，供预取器使用。
+        use_cache=False 时绕过本地响应缓存（重新验证要拿到服务器的最新结果）。
+        """
+        async def fetch(page_num: int) -> dict:
+            # 本地目录已完整同步时直接从本地分页排序
+            if self._catalog is not None and order != "random" and self._catalog.is_complete:
+                return self._catalog.get_works(page=page_num, order=order)
+            return await self._api.get_works(page=page_num, order=order, use_cache=use_cache)
+        return fetch
 
     async def _on_order_change(self, e):
+        self._stash_view()
         self._order = e.control.value
+        self._generation += 1
+        self._prefetcher.reset(self._works_fetcher(self._order))
+        self._showing_snapshot = False
+
+        view = self._views.pop(self._order, None)
+        if view is not None:
+            # 切回缓存过的排序：立即恢复，后台确认第一页有没有变化
+            self._show_grid(view.grid)
+            self._page_num = view.page_num
+            self._has_more = view.has_more
+            if self._has_more:
+                self._prefetcher.schedule_after(self._page_num)
+            request_update(self)
+            self.page.run_task(self._revalidate, self._order, view.grid)
+            return
+
+        self._show_grid(self._new_grid())
         self._page_num = 1
-        self.grid.controls.clear()
+        self._has_more = True
         await self.load_data()
 
-    async def _load_more(self, e):
+    # ── 排序缓存 ──────────────────────────────────────
+
+    def _new_grid(self) -> WorkGrid:
+        return WorkGrid(
+            on_work_click=self._on_work_click,
+            cover_cache=self._cover_cache,
+            on_end_reached=self._load_more,
+            pool=self._pool,
+        )
+
+    def _show_grid(self, grid: WorkGrid):
+        self.grid = grid
+        self.controls[1] = grid
+
+    def _stash_view(self):
+        """把当前排序的内容放入缓存；不可缓存或不完整的直接丢弃。"""
+        grid = self.grid
+        if (self._order in self.UNCACHEABLE or self._showing_snapshot
+                or grid.work_count == 0 or grid.has_messages):
+            grid.clear()
+            return
+        # 正在加载的那一页作废，记为只加载到上一页
+        page_num = self._page_num - 1 if self._loading else self._page_num
+        self._views[self._order] = _OrderView(grid, page_num, self._has_more)
+        self._views.move_to_end(self._order)
+        while len(self._views) > self.MAX_CACHED_ORDERS:
+            _, evicted = self._views.popitem(last=False)
+            evicted.grid.clear()
+
+    async def _revalidate(self, order: str, grid: WorkGrid):
+        """后台重新请求第一页，作品有变化时用新结果替换缓存的内容。"""
+        try:
+            data = await self._works_fetcher(order, use_cache=False)(1)
+        except Exception as e:
+            print(f"Revalidate {order} failed: {e}")
+            return
+        works = data.get("works", [])
+        cached = grid.works[:len(works)]
+        if not works or [w.id for w in works] == [w.id for w in cached]:
+            return
+        if grid is not self.grid:
+            # 已经切走：丢掉这份过期缓存，下次切回时重新加载
+            if order in self._views and self._views[order].grid is grid:
+                del self._views[order]
+            grid.clear()
+            return
+        self._generation += 1  # 丢弃旧内容上正在加载的下一页
+        grid.clear()
+        grid.add_works(works)
+        self._page_num = 1
+        self._has_more = True
+        self._prefetcher.reset()
+        self._prefetcher.schedule_after(1)
+        request_update(self)
+        await self._save_snapshot(works)
+
+    async def _load_more(self):
+        """滚动到底部时加载下一页"""
+        if self._loading or not self._has_more:
+            return
         self._page_num += 1
         await self.load_data()
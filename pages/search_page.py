@@ -1,22 +1,53 @@
 """
 搜索页面
 关键词搜索 ASMR 作品，支持排序和分页。
+输入时自动搜索（防抖），新的搜索会取消仍在进行的旧请求。
+本地索引的命中结果先行展示，服务器结果返回后再合并（去重）。
+输入时根据本地字典补全标签、声优和社团名。
 """
 
+import asyncio
+from typing import Optional
+
 import flet as ft
 from asmr_api import AsmrApi
-from components.work_card import WorkCard
+from components.work_grid import WorkGrid
+from services.prefetch import PagePrefetcher
+from services.ui_updates import request_update
 
 
 class SearchPage(ft.Column):
     """搜索页面"""
 
-    def __init__(self, on_work_click=None):
+    # 输入停顿多久后自动搜索（秒）
+    DEBOUNCE_SECONDS = 0.4
+
+    # 补全候选的图标
+    SUGGEST_ICONS = {
+        "tag": ft.Icons.SELL_ROUNDED,
+        "va": ft.Icons.MIC_ROUNDED,
+        "circle": ft.Icons.GROUPS_ROUNDED,
+    }
+
+    def __init__(self, api: AsmrApi, on_work_click=None, cover_cache=None,
+                 search_index=None, dictionaries=None):
         super().__init__(expand=True, spacing=0)
+        self._api = api
+        self._search_index = search_index
+        self._dictionaries = dictionaries
         self._on_work_click = on_work_click
         self._page_num = 1
         self._keyword = ""
         self._loading = False
+        self._has_more = True
+        self._shown_ids: set = set()  # 当前结果中已展示的作品 ID
+        self._generation = 0  # 关键词每变一次 +1，用于丢弃过期结果
+        self._debounce_task: Optional[asyncio.Task] = None
+        self._search_task: Optional[asyncio.Task] = None
+        self._prefetcher = PagePrefetcher(
+            self._search_fetcher(""),
+            on_prefetched=cover_cache.prefetch_page if cover_cache else None,
+        )
 
         # 搜索框
         self.search_field = ft.TextField(
@@ -29,19 +60,17 @@ class SearchPage(ft.Column):
             focused_border_color=ft.Colors.DEEP_PURPLE_ACCENT_100,
             color=ft.Colors.WHITE,
             hint_style=ft.TextStyle(color=ft.Colors.WHITE38),
+            on_change=self._on_query_change,
             on_submit=self._on_search,
             content_padding=ft.padding.symmetric(horizontal=16, vertical=8),
         )
 
-        # 结果网格
-        self.grid = ft.GridView(
-            runs_count=2,
-            max_extent=220,
-            child_aspect_ratio=0.62,
-            spacing=12,
-            run_spacing=12,
-            expand=True,
-            padding=ft.padding.symmetric(horizontal=16, vertical=8),
+        # 结果网格（虚拟化，滚动到底部自动加载下一页）
+        self.grid = WorkGrid(
+            on_work_click=on_work_click,
+            cover_cache=cover_cache,
+            on_end_reached=self._load_more,
+            api=api,
         )
 
         # 空状态提示
@@ -67,19 +96,6 @@ class SearchPage(ft.Column):
             expand=True,
         )
 
-        # 加载更多
-        self.load_more_btn = ft.Container(
-            content=ft.TextButton(
-                text="加载更多",
-                icon=ft.Icons.EXPAND_MORE_ROUNDED,
-                on_click=self._load_more,
-                style=ft.ButtonStyle(color=ft.Colors.DEEP_PURPLE_ACCENT_100),
-            ),
-            alignment=ft.Alignment(0, 0),
-            padding=ft.padding.only(bottom=80),
-            visible=False,
-        )
-
         self.loading_ring = ft.Container(
             content=ft.ProgressRing(
                 width=30, height=30,
@@ -90,50 +106,155 @@ class SearchPage(ft.Column):
             visible=False,
         )
 
+        # 自动补全候选
+        self.suggestions = ft.Row(
+            spacing=6,
+            scroll=ft.ScrollMode.AUTO,
+            visible=False,
+        )
+
         # 顶部搜索栏
         header = ft.Container(
-            content=self.search_field,
+            content=ft.Column(
+                controls=[self.search_field, self.suggestions],
+                spacing=8,
+            ),
             padding=ft.padding.only(left=16, right=16, top=12, bottom=8),
         )
 
-        self.controls = [header, self.empty_hint, self.grid, self.loading_ring, self.load_more_btn]
+        self.controls = [header, self.empty_hint, self.grid, self.loading_ring]
+
+    async def _on_query_change(self, e):
+        """输入变化：立即更新补全候选，防抖后自动搜索"""
+        self._update_suggestions(self.search_field.value or "")
+        if self._debounce_task:
+            self._debounce_task.cancel()
+        self._debounce_task = asyncio.create_task(self._debounced_search())
+
+    async def _debounced_search(self):
+        await asyncio.sleep(self.DEBOUNCE_SECONDS)
+        # 防抖只在等待期间可取消：搜索开始后由 _run_search 管理，
+        # 之后的按键若关键词不变不会再发起搜索，不能把这次取消掉
+        self._debounce_task = None
+        await self._start_search(self.search_field.value)
 
     async def _on_search(self, e):
-        keyword = self.search_field.value.strip()
-        if not keyword:
+        """回车提交：立即搜索（相同关键词也重新搜索）"""
+        if self._debounce_task:
+            self._debounce_task.cancel()
+        self._update_suggestions("")
+        await self._start_search(self.search_field.value, force=True)
+
+    def _update_suggestions(self, text: str):
+        """根据输入刷新补全候选（本地字典，逐键调用）"""
+        hits = self._dictionaries.suggest(text) if self._dictionaries else []
+        self.suggestions.controls = [
+            ft.Container(
+                content=ft.Row(
+                    controls=[
+                        ft.Icon(self.SUGGEST_ICONS.get(kind), size=12,
+                                color=ft.Colors.DEEP_PURPLE_ACCENT_100),
+                        ft.Text(name, size=12, color=ft.Colors.WHITE70),
+                    ],
+                    spacing=4,
+                    tight=True,
+                ),
+                padding=ft.padding.symmetric(horizontal=10, vertical=4),
+                border_radius=12,
+                bgcolor=ft.Colors.with_opacity(0.15, ft.Colors.DEEP_PURPLE),
+                data=name,
+                on_click=self._pick_suggestion,
+            )
+            for kind, name in hits
+        ]
+        self.suggestions.visible = bool(hits)
+        request_update(self.suggestions)
+
+    async def _pick_suggestion(self, e):
+        self.search_field.value = e.control.data
+        await self._on_search(e)
+
+    async def _start_search(self, text: str, force: bool = False):
+        keyword = (text or "").strip()
+        if not keyword or (keyword == self._keyword and not force):
             return
         self._keyword = keyword
         self._page_num = 1
-        self.grid.controls.clear()
+        self._generation += 1
+        self._prefetcher.reset(self._search_fetcher(keyword))
+        self._has_more = True
+        self.grid.clear()
+        self._shown_ids.clear()
         self.empty_hint.visible = False
-        self.load_more_btn.visible = False
-        await self._do_search()
+        self._show_local_hits(keyword)
+        await self._run_search()
+
+    def _show_local_hits(self, keyword: str):
+        """先展示本地索引的命中结果，不等网络。"""
+        if self._search_index is None:
+            return
+        try:
+            hits = self._search_index.search(keyword)
+        except Exception as e:
+            print(f"Local search failed: {e}")
+            return
+        if hits:
+            self._add_works(hits)
+            request_update(self)
 
-    async def _load_more(self, e):
+    def _add_works(self, works: list):
+        """追加作品并去掉已展示过的。"""
+        fresh = [w for w in works if w.id not in self._shown_ids]
+        self._shown_ids.update(w.id for w in fresh)
+        if fresh:
+            self.grid.add_works(fresh)
+
+    async def _load_more(self):
+        """滚动到底部时加载下一页"""
+        if self._loading or not self._has_more:
+            return
         self._page_num += 1
-        await self._do_search()
+        await self._run_search()
+
+    async def _run_search(self):
+        """启动一次搜索请求，取消仍在进行的旧请求。"""
+        if self._search_task and not self._search_task.done():
+            self._search_task.cancel()
+        self._search_task = asyncio.create_task(self._do_search())
+        try:
+            await self._search_task
+        except asyncio.CancelledError:
+            # 被新搜索取代时静默结束；自身被取消则继续向上传递
+            if asyncio.current_task().cancelling():
+                raise
+
+    def _search_fetcher(self, keyword: str):
+        """绑定关键词的分页请求函数，供预取器使用。"""
+        async def fetch(page_num: int) -> dict:
+            return await self._api.search(keyword, page=page_num)
+        return fetch
 
     async def _do_search(self):
-        if self._loading:
-            return
+        generation = self._generation
         self._loading = True
-        self.loading_ring.visible = True
-        self.update()
+        self.grid.clear_error()
+        if not self._prefetcher.ready(self._page_num):
+            self.loading_ring.visible = True
+            request_update(self)
 
         try:
-            async with AsmrApi() as api:
-                data = await api.search(self._keyword, page=self._page_num)
+            data = await self._prefetcher.get(self._page_num)
+            if generation != self._generation:
+                return
 
             works = data.get("works", [])
             if works:
-                for w in works:
-                    card = WorkCard(w, on_click=self._on_work_click)
-                    self.grid.controls.append(card)
-                self.load_more_btn.visible = True
+                self._add_works(works)
+                self._prefetcher.schedule_after(self._page_num)
             else:
-                self.load_more_btn.visible = False
-                if self._page_num == 1:
-                    self.grid.controls.append(
+                self._has_more = False
+                if self._page_num == 1 and not self._shown_ids:
+                    self.grid.add_message(
                         ft.Container(
                             content=ft.Text(
                                 "没有找到相关作品",
@@ -144,13 +265,19 @@ class SearchPage(ft.Column):
                         )
                     )
         except Exception as e:
-            self.grid.controls.append(
-                ft.Container(
-                    content=ft.Text(f"搜索失败: {e}", color=ft.Colors.RED_300),
-                    padding=20,
-                )
+            if generation != self._generation:
+                return
+            # 退回失败前的页码，重试（或继续滚动到底部）时重新请求这一页
+            self._page_num -= 1
+            # 离线时保留本地结果，只给出提示
+            message = (
+                f"网络不可用，仅显示本地结果 ({e})" if self._shown_ids
+                else f"搜索失败: {e}"
             )
+            self.grid.add_error(message, on_retry=self._load_more)
         finally:
-            self._loading = False
-            self.loading_ring.visible = False
-            self.update()
+            # 已被更新的搜索取代时，加载状态归新搜索管理
+            if generation == self._generation:
+                self._loading = False
+                self.loading_ring.visible = False
+                request_update(self)
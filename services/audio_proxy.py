@@ -0,0 +1,353 @@
+"""
+本地音频缓存代理
+在 127.0.0.1 上起一个极简 HTTP 服务，AudioPlayer 把远程音频地址换成代理地址：
+- 请求的字节区间已缓存则直接从磁盘返回，不走网络
+- 缺失的区间从上游边下边转发，同时写入稀疏缓存文件
+- 每个音频一个缓存文件，按最近访问时间整文件淘汰，总量不超过配额；
+  正在播放（转发中）的文件不会被淘汰
+- 上游没有给出文件大小时无法按区间缓存，直接转发
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from services.storage import cache_dir
+
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+_CONTENT_RANGE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+)")
+_BLOCK = 64 * 1024
+
+
+def add_range(ranges: list, start: int, end: int) -> list:
+    """把半开区间 [start, end) 并入已排序、互不重叠的区间列表。"""
+    merged = []
+    for s, e in sorted(ranges + [[start, end]]):
+        if merged and s <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], e)
+        else:
+            merged.append([s, e])
+    return merged
+
+
+def split_range(ranges: list, start: int, end: int) -> list:
+    """把 [start, end) 切成 [(s, e, 是否已缓存), ...]。"""
+    parts, pos = [], start
+    for s, e in ranges:
+        if e <= pos or s >= end:
+            continue
+        if s > pos:
+            parts.append((pos, s, False))
+        parts.append((max(s, pos), min(e, end), True))
+        pos = min(e, end)
+    if pos < end:
+        parts.append((pos, end, False))
+    return parts
+
+
+class _Entry:
+    """一个音频的缓存文件及其元数据"""
+
+    def __init__(self, root: Path, key: str):
+        self.key = key
+        self.data_path = root / f"{key}.data"
+        self.meta_path = root / f"{key}.json"
+        self.url = ""
+        self.size: Optional[int] = None
+        self.content_type = "audio/mpeg"
+        self.ranges: list = []
+        self.accessed = time.time()
+        self.lock = asyncio.Lock()
+        self.readers = 0  # 正在转发的请求数，大于 0 时不淘汰
+        self.passthrough = False  # 上游大小未知，不缓存
+        if self.meta_path.exists():
+            try:
+                meta = json.loads(self.meta_path.read_text())
+                self.url = meta["url"]
+                self.size = meta["size"] or None  # 旧版本大小未知时记为 0
+                self.content_type = meta.get("content_type", self.content_type)
+                self.ranges = meta["ranges"]
+                self.accessed = meta.get("accessed", self.accessed)
+            except Exception:
+                self.ranges = []
+
+    @property
+    def cached_bytes(self) -> int:
+        return sum(e - s for s, e in self.ranges)
+
+    def save(self):
+        self.meta_path.write_text(json.dumps({
+            "url": self.url,
+            "size": self.size,
+            "content_type": self.content_type,
+            "ranges": self.ranges,
+            "accessed": self.accessed,
+        }))
+
+    def remove(self):
+        for p in (self.data_path, self.meta_path):
+            try:
+                p.unlink()
+            except OSError:
+                pass
+
+
+class AudioCacheProxy:
+    """本地音频缓存代理"""
+
+    def __init__(self, root: Optional[Path] = None, quota: int = 1024 * 1024 * 1024):
+        """
+        参数:
+            root: 缓存目录
+            quota: 缓存总量上限（字节），超出时按最近访问时间淘汰整个文件
+        """
+        self.root = root or cache_dir() / "audio"
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.quota = quota
+        self._entries: dict[str, _Entry] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self.port = 0
+        for meta in self.root.glob("*.json"):
+            entry = _Entry(self.root, meta.stem)
+            if entry.url:
+                self._entries[entry.key] = entry
+
+    # ── 生命周期 ──────────────────────────────────────
+
+    async def start(self):
+        if self._server is not None:
+            return
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(15.0, read=30.0),
+            follow_redirects=True,
+            headers={"User-Agent": "AsmrApi/1.0"},
+        )
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def aclose(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        for entry in self._entries.values():
+            if entry.ranges:
+                entry.save()
+
+    # ── 对外接口 ──────────────────────────────────────
+
+    def url_for(self, upstream: str) -> str:
+        """返回给播放器使用的本地代理地址。"""
+        key = hashlib.sha1(upstream.encode()).hexdigest()
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _Entry(self.root, key)
+            entry.url = upstream
+            self._entries[key] = entry
+        return f"http://127.0.0.1:{self.port}/a/{key}"
+
+    async def preload(self, upstream: str, length: int = 512 * 1024):
+        """预先缓存音频开头的 length 字节（用于下一首预加载）。"""
+        self.url_for(upstream)
+        entry = self._entries[hashlib.sha1(upstream.encode()).hexdigest()]
+        async with entry.lock:
+            await self._ensure_size(entry)
+            if entry.passthrough:
+                return
+            end = min(length, entry.size)
+            for s, e, cached in split_range(entry.ranges, 0, end):
+                if not cached:
+                    async for _ in self._fetch(entry, s, e):
+                        pass
+            entry.save()
+
+    # ── HTTP 处理 ─────────────────────────────────────
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+            lines = request.decode("latin-1").split("\r\n")
+            method, path, _ = lines[0].split(" ", 2)
+            headers = {}
+            for line in lines[1:]:
+                if ":" in line:
+                    k, v = line.split(":", 1)
+                    headers[k.strip().lower()] = v.strip()
+
+            entry = self._entries.get(path.rsplit("/", 1)[-1])
+            if entry is None or method not in ("GET", "HEAD"):
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                return
+            await self._serve(entry, method, headers.get("range"), writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # 播放器拖动进度时会主动断开
+        except Exception as e:
+            print(f"Audio proxy error: {e}")
+        finally:
+            try:
+                await writer.drain()
+                writer.close()
+            except Exception:
+                pass
+
+    async def _serve(self, entry: _Entry, method: str, range_header: Optional[str],
+                     writer: asyncio.StreamWriter):
+        async with entry.lock:
+            await self._ensure_size(entry)
+        if entry.passthrough:
+            await self._passthrough(entry, method, range_header, writer)
+            return
+        size = entry.size
+        start, end = 0, size
+        status = "200 OK"
+        m = _RANGE.match(range_header or "")
+        if m and (m.group(1) or m.group(2)):
+            if m.group(1):
+                start = int(m.group(1))
+                end = int(m.group(2)) + 1 if m.group(2) else size
+            else:
+                start = max(0, size - int(m.group(2)))
+            end = min(end, size)
+            status = "206 Partial Content"
+            if start >= end:
+                writer.write(
+                    f"HTTP/1.1 416 Range Not Satisfiable\r\nContent-Range: bytes */{size}\r\n"
+                    "Content-Length: 0\r\nConnection: close\r\n\r\n".encode("latin-1")
+                )
+                return
+
+        head = [
+            f"HTTP/1.1 {status}",
+            f"Content-Type: {entry.content_type}",
+            "Accept-Ranges: bytes",
+            f"Content-Length: {end - start}",
+            "Connection: close",
+        ]
+        if status.startswith("206"):
+            head.append(f"Content-Range: bytes {start}-{end - 1}/{size}")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+        if method == "HEAD":
+            return
+
+        entry.accessed = time.time()
+        entry.readers += 1
+        try:
+            for s, e, cached in split_range(entry.ranges, start, end):
+                if cached:
+                    await self._send_cached(entry, s, e, writer)
+                else:
+                    async for data in self._fetch(entry, s, e):
+                        writer.write(data)
+                        await writer.drain()
+        finally:
+            entry.readers -= 1
+            entry.save()
+            self._evict(keep=entry.key)
+
+    async def _passthrough(self, entry: _Entry, method: str, range_header: Optional[str],
+                           writer: asyncio.StreamWriter):
+        """原样转发上游响应，不写缓存。"""
+        headers = {"Range": range_header} if range_header else {}
+        async with self._client.stream(method, entry.url, headers=headers) as resp:
+            head = [
+                f"HTTP/1.1 {resp.status_code} {resp.reason_phrase}",
+                f"Content-Type: {resp.headers.get('Content-Type', entry.content_type)}",
+                "Connection: close",
+            ]
+            if "Content-Range" in resp.headers:
+                head.append(f"Content-Range: {resp.headers['Content-Range']}")
+            # 压缩传输时转发的是解压后的数据，长度对不上，靠关闭连接结束
+            length = resp.headers.get("Content-Length")
+            if length and not resp.headers.get("Content-Encoding"):
+                head.append(f"Content-Length: {length}")
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+            if method == "HEAD":
+                return
+            async for data in resp.aiter_bytes(_BLOCK):
+                writer.write(data)
+                await writer.drain()
+
+    async def _send_cached(self, entry: _Entry, start: int, end: int,
+                           writer: asyncio.StreamWriter):
+        with open(entry.data_path, "rb") as f:
+            f.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                data = f.read(min(_BLOCK, remaining))
+                if not data:
+                    break
+                writer.write(data)
+                await writer.drain()
+                remaining -= len(data)
+
+    # ── 上游 ──────────────────────────────────────────
+
+    async def _ensure_size(self, entry: _Entry):
+        """
+        首次访问时向上游探测文件大小与类型。
+        拿不到大小（206 的总长为 *，或 200 没有 Content-Length）时标记为直接转发。
+        """
+        if entry.size is not None or entry.passthrough:
+            return
+        size = None
+        async with self._client.stream("GET", entry.url, headers={"Range": "bytes=0-0"}) as resp:
+            resp.raise_for_status()
+            if resp.status_code == 206:
+                m = _CONTENT_RANGE.match(resp.headers.get("Content-Range", ""))
+                if m:
+                    size = int(m.group(3))
+            elif not resp.headers.get("Content-Encoding"):
+                length = resp.headers.get("Content-Length")
+                size = int(length) if length else None
+            entry.content_type = resp.headers.get("Content-Type", entry.content_type)
+        if not size:
+            entry.passthrough = True
+            return
+        entry.size = size
+        if not entry.data_path.exists():
+            with open(entry.data_path, "wb") as f:
+                f.truncate(entry.size)
+        entry.save()
+
+    async def _fetch(self, entry: _Entry, start: int, end: int):
+        """从上游拉取 [start, end)，边产出数据边写入缓存。"""
+        headers = {"Range": f"bytes={start}-{end - 1}"}
+        async with self._client.stream("GET", entry.url, headers=headers) as resp:
+            resp.raise_for_status()
+            if resp.status_code != 206 and start > 0:
+                raise IOError("上游不支持 Range")
+            pos = start
+            with open(entry.data_path, "r+b") as f:
+                async for data in resp.aiter_bytes(_BLOCK):
+                    data = data[:end - pos]
+                    if not data:
+                        break
+                    f.seek(pos)
+                    f.write(data)
+                    entry.ranges = add_range(entry.ranges, pos, pos + len(data))
+                    pos += len(data)
+                    yield data
+
+    # ── 淘汰 ──────────────────────────────────────────
+
+    def _evict(self, keep: str):
+        total = sum(e.cached_bytes for e in self._entries.values())
+        for entry in sorted(self._entries.values(), key=lambda e: e.accessed):
+            if total <= self.quota:
+                break
+            # 正在转发或预加载的文件不淘汰，否则会删掉正在读写的数据
+            if entry.key == keep or entry.readers or entry.lock.locked():
+                continue
+            total -= entry.cached_bytes
+            entry.remove()
+            entry.ranges = []
+            entry.size = None
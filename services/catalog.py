@@ -0,0 +1,350 @@
+"""
+本地作品目录
+CatalogStore 把作品存到本地 SQLite，可按 API 相同的方式分页、排序、筛选；
+CatalogSync 用多个并发 worker + 令牌桶限速遍历 /works 的所有页面，
+每完成一页就记录检查点，中断后可从断点继续。
+应用内由 run_periodic 在后台低速爬取（跨会话续爬），命令行可用更高并发一次爬完。
+已有完整目录后用增量同步：按上传时间倒序翻页，遇到已知作品即停止；
+并定期刷新近期作品的下载数、评分、评论数等易变字段。
+
+命令行用法:
+    python -m services.catalog --workers 4 --rate 4
+    python -m services.catalog --delta
+"""
+
+import asyncio
+import json
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from asmr_api import AsmrApi
+from services.models import Work
+from services.ratelimit import TokenBucket
+from services.resilience import CircuitOpenError
+from services.storage import data_dir
+
+# 可在本地排序的字段（与 API 的 order 参数一致）
+SORTABLE = ("create_date", "release", "dl_count", "price",
+            "rate_average_2dp", "review_count", "id")
+
+# 全量爬取使用按 ID 升序：新作品只会追加在末尾，爬取期间页码不会整体偏移
+CRAWL_ORDER = ("id", "asc")
+
+
+class CatalogStore:
+    """本地作品目录"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or data_dir() / "catalog.db"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS works (
+                id INTEGER PRIMARY KEY,
+                create_date TEXT,
+                release TEXT,
+                dl_count INTEGER,
+                price INTEGER,
+                rate_average_2dp REAL,
+                review_count INTEGER,
+                has_subtitle INTEGER,
+                data TEXT NOT NULL,
+                seen_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS works_create_date ON works (create_date);
+            CREATE INDEX IF NOT EXISTS works_release ON works (release);
+            CREATE INDEX IF NOT EXISTS works_dl_count ON works (dl_count);
+            CREATE INDEX IF NOT EXISTS works_rate ON works (rate_average_2dp);
+            CREATE INDEX IF NOT EXISTS works_review_count ON works (review_count);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS crawl_pages (page INTEGER PRIMARY KEY);
+            """
+        )
+        self._conn.commit()
+
+    # ── 作品 ──────────────────────────────────────────
+
+    def upsert_works(self, works: Iterable[Work]):
+        now = time.time()
+        rows = [
+            (
+                w.id,
+                w.create_date,
+                w.release,
+                w.dl_count,
+                w.price,
+                w.rate,
+                w.review_count,
+                1 if w.has_subtitle else 0,
+                json.dumps(w.to_json(), ensure_ascii=False),
+                now,
+            )
+            for w in works if w.id
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO works VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def known_ids(self, ids: Iterable[int]) -> set:
+        """返回 ids 中本地已有的作品 ID。"""
+        ids = list(ids)
+        if not ids:
+            return set()
+        marks = ",".join("?" * len(ids))
+        with self._lock:
+            rows = self._conn.execute(f"SELECT id FROM works WHERE id IN ({marks})", ids)
+            return {r[0] for r in rows}
+
+    def get_works(self, page: int = 1, order: str = "create_date", sort: str = "desc",
+                  subtitle: int = 0, page_size: int = 20) -> dict:
+        """按 API 相同的结构返回本地分页结果。"""
+        if order not in SORTABLE:
+            raise ValueError(f"不支持本地排序: {order}")
+        direction = "ASC" if sort == "asc" else "DESC"
+        where = "WHERE has_subtitle = 1" if subtitle else ""
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM works {where}").fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT data FROM works {where} ORDER BY {order} {direction}, id {direction} "
+                "LIMIT ? OFFSET ?",
+                (page_size, (page - 1) * page_size),
+            ).fetchall()
+        return {
+            "works": [Work.from_json(json.loads(r[0])) for r in rows],
+            "pagination": {"currentPage": page, "pageSize": page_size, "totalCount": total},
+        }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM works").fetchone()[0]
+
+    # ── 检查点 ────────────────────────────────────────
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, str(value)))
+            self._conn.commit()
+
+    def done_pages(self) -> set:
+        with self._lock:
+            return {r[0] for r in self._conn.execute("SELECT page FROM crawl_pages")}
+
+    def mark_page_done(self, page: int):
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO crawl_pages VALUES (?)", (page,))
+            self._conn.commit()
+
+    def reset_crawl(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM crawl_pages")
+            self._conn.execute("DELETE FROM meta WHERE key LIKE 'crawl_%'")
+            self._conn.commit()
+
+    @property
+    def is_complete(self) -> bool:
+        """是否已完整爬取过一次。"""
+        return self.get_meta("crawl_completed_at") is not None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CatalogSync:
+    """目录同步引擎"""
+
+    def __init__(self, api: AsmrApi, store: CatalogStore, workers: int = 4,
+                 rate: float = 4.0, max_attempts: int = 3,
+                 on_progress: Optional[Callable[[int, int], None]] = None):
+        """
+        参数:
+            api: 已启动的 AsmrApi
+            store: 本地目录
+            workers: 并发请求数
+            rate: 每秒最多请求数
+            max_attempts: 单页最多尝试次数，仍失败则留待下次续爬
+            on_progress: 进度回调 (已完成页数, 总页数)
+        """
+        self._api = api
+        self.store = store
+        self.workers = workers
+        self.bucket = TokenBucket(rate)
+        self.max_attempts = max_attempts
+        self.on_progress = on_progress
+
+    async def _fetch_page(self, page: int) -> dict:
+        order, sort = CRAWL_ORDER
+        await self.bucket.acquire()
+        return await self._api.get_works(page=page, order=order, sort=sort, use_cache=False)
+
+    async def crawl(self) -> int:
+        """
+        全量爬取（可续爬）。返回本次新完成的页数。
+        """
+        total_pages = self.store.get_meta("crawl_total_pages")
+        if total_pages is None:
+            first = await self._fetch_page(1)
+            self.store.upsert_works(first.get("works", []))
+            self.store.mark_page_done(1)
+            pagination = first.get("pagination", {})
+            page_size = pagination.get("pageSize") or len(first.get("works", [])) or 1
+            total_pages = math.ceil(pagination.get("totalCount", 0) / page_size)
+            self.store.set_meta("crawl_total_pages", total_pages)
+            self.store.set_meta("crawl_started_at", time.time())
+        total_pages = int(total_pages)
+
+        done = self.store.done_pages()
+        queue: asyncio.Queue = asyncio.Queue()
+        for page in range(1, total_pages + 1):
+            if page not in done:
+                queue.put_nowait(page)
+        completed = 0
+
+        async def worker():
+            nonlocal completed
+            while True:
+                try:
+                    page = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                for attempt in range(1, self.max_attempts + 1):
+                    try:
+                        data = await self._fetch_page(page)
+                    except CircuitOpenError as e:
+                        # 服务暂时不可用：本轮到此为止，剩下的页留待续爬
+                        print(f"Crawl paused: {e}")
+                        return
+                    except Exception as e:
+                        print(f"Crawl page {page} attempt {attempt} failed: {e}")
+                        await asyncio.sleep(2 ** attempt)
+                        continue
+                    self.store.upsert_works(data.get("works", []))
+                    self.store.mark_page_done(page)
+                    completed += 1
+                    if self.on_progress:
+                        self.on_progress(len(done) + completed, total_pages)
+                    break
+
+        await asyncio.gather(*(worker() for _ in range(self.workers)))
+
+        if len(self.store.done_pages()) >= total_pages:
+            self.store.set_meta("crawl_completed_at", time.time())
+        return completed
+
+    # ── 增量同步 ──────────────────────────────────────
+
+    async def _fetch_latest(self, page: int) -> list:
+        await self.bucket.acquire()
+        data = await self._api.get_works(
+            page=page, order="create_date", sort="desc", use_cache=False
+        )
+        return data.get("works", [])
+
+    async def sync_delta(self, max_pages: int = 50) -> int:
+        """
+        按上传时间倒序翻页，直到某页出现本地已有的作品为止。
+        返回新增作品数。
+        """
+        added = 0
+        for page in range(1, max_pages + 1):
+            works = await self._fetch_latest(page)
+            if not works:
+                break
+            known = self.store.known_ids(w.id for w in works)
+            self.store.upsert_works(works)
+            added += len(works) - len(known)
+            if known:
+                break
+        self.store.set_meta("delta_synced_at", time.time())
+        return added
+
+    async def refresh_recent(self, days: int = 14, max_pages: int = 20) -> int:
+        """
+        重新拉取最近 days 天上传的作品，更新下载数、评分、评论数等易变字段。
+        返回刷新的作品数。
+        """
+        cutoff = time.strftime("%Y-%m-%d", time.gmtime(time.time() - days * 86400))
+        refreshed = 0
+        for page in range(1, max_pages + 1):
+            works = await self._fetch_latest(page)
+            if not works:
+                break
+            self.store.upsert_works(works)
+            refreshed += len(works)
+            if (works[-1].create_date or "") < cutoff:
+                break
+        self.store.set_meta("stats_refreshed_at", time.time())
+        return refreshed
+
+    async def run_periodic(self, delta_interval: float = 15 * 60,
+                           refresh_interval: float = 6 * 3600,
+                           crawl_retry: float = 5 * 60):
+        """
+        后台循环：目录还不完整时先从检查点续爬全量（失败的页隔 crawl_retry 秒再试），
+        完成后定期增量同步，并按更长周期刷新近期作品统计。
+        """
+        while not self.store.is_complete:
+            try:
+                await self.crawl()
+            except Exception as e:
+                print(f"Catalog crawl failed: {e}")
+            if not self.store.is_complete:
+                await asyncio.sleep(crawl_retry)
+        while True:
+            now = time.time()
+            try:
+                if now - float(self.store.get_meta("delta_synced_at") or 0) >= delta_interval:
+                    await self.sync_delta()
+                if now - float(self.store.get_meta("stats_refreshed_at") or 0) >= refresh_interval:
+                    await self.refresh_recent()
+            except Exception as e:
+                print(f"Catalog sync failed: {e}")
+            await asyncio.sleep(min(delta_interval, refresh_interval))
+
+
+# ── 命令行 ───────────────────────────────────────────
+
+async def _main(workers: int, rate: float, restart: bool, delta: bool):
+    store = CatalogStore()
+    if restart:
+        store.reset_crawl()
+    # 客户端自身的限速不低于 --rate
+    async with AsmrApi(rate=max(rate, AsmrApi.rate)) as api:
+        sync = CatalogSync(
+            api, store, workers=workers, rate=rate,
+            on_progress=lambda d, t: print(f"\r{d}/{t} pages", end="", flush=True),
+        )
+        if delta:
+            added = await sync.sync_delta()
+            refreshed = await sync.refresh_recent()
+            print(f"新增 {added} 部，刷新 {refreshed} 部，目录共 {len(store)} 部作品")
+        else:
+            count = await sync.crawl()
+            print(f"\n完成 {count} 页，目录共 {len(store)} 部作品")
+    store.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="同步 asmr.one 作品目录到本地")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=4.0, help="每秒最多请求数")
+    parser.add_argument("--restart", action="store_true", help="忽略检查点，从头爬取")
+    parser.add_argument("--delta", action="store_true", help="仅增量同步并刷新近期统计")
+    args = parser.parse_args()
+    asyncio.run(_main(args.workers, args.rate, args.restart, args.delta))
@@ -0,0 +1,168 @@
+"""
+封面图缓存
+每个作品的每种尺寸只下载一次，存到本地磁盘，按 LRU 在字节预算内淘汰。
+图片控件拿到的是本地文件路径；未缓存时控件先显示占位，后台下载完成后
+再换上本地路径（每张封面只经网络下载一次）。
+"""
+
+import asyncio
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from asmr_api import AsmrApi
+from services.storage import cache_dir
+
+
+class CoverCache:
+    """封面图本地缓存（LRU + 字节预算）"""
+
+    def __init__(self, api: AsmrApi, root: Optional[Path] = None,
+                 max_bytes: int = 200 * 1024 * 1024, max_concurrency: int = 4):
+        self._api = api
+        self.root = root or cache_dir() / "covers"
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._sem = asyncio.Semaphore(max_concurrency)
+        self._pending: dict[str, asyncio.Task] = {}
+        # 文件名 -> 字节数，按最近使用排序（末尾最新）
+        self._lru: OrderedDict[str, int] = OrderedDict()
+        self._total = 0
+        # 磁盘上已有封面的扫描（逐个 stat）放到后台，不占首屏时间
+        self._load_task: Optional[asyncio.Task] = None
+
+    def load(self) -> asyncio.Task:
+        """
+        后台扫描磁盘上已缓存的封面并重建 LRU，可重复调用（只扫描一次）。
+        扫描完成前 local_path 视为未命中，下载任务会先等扫描结束再判断。
+        """
+        if self._load_task is None:
+            self._load_task = asyncio.create_task(self._load())
+        return self._load_task
+
+    async def _load(self):
+        try:
+            entries = await asyncio.to_thread(self._scan)
+        except Exception as e:
+            print(f"Cover cache scan failed: {e}")
+            return
+        # 扫描期间新下载的封面更新，排在后面
+        lru = OrderedDict((name, size) for name, size in entries if name not in self._lru)
+        lru.update(self._lru)
+        self._lru = lru
+        self._total = sum(lru.values())
+        self._evict()
+
+    def _scan(self) -> list:
+        """按修改时间从旧到新列出 [(文件名, 字节数), ...]（在线程里运行）"""
+        entries = []
+        for p in self.root.glob("*.jpg"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, p.name, st.st_size))
+        return [(name, size) for _, name, size in sorted(entries)]
+
+    @staticmethod
+    def _name(work_id: int, size: str) -> str:
+        return f"{work_id}_{size}.jpg"
+
+    def local_path(self, work_id: int, size: str = "sam") -> Optional[str]:
+        """已缓存则返回本地路径（并标记为最近使用），否则返回 None。"""
+        name = self._name(work_id, size)
+        if name not in self._lru:
+            return None
+        self._lru.move_to_end(name)
+        path = self.root / name
+        try:
+            os.utime(path)
+        except OSError:
+            # 文件被外部清理了
+            self._total -= self._lru.pop(name)
+            return None
+        return str(path)
+
+    def src(self, work_id: int, size: str = "sam",
+            on_ready: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """
+        给图片控件用的 src：已缓存返回本地路径。
+        未命中时返回 None（控件先显示占位）并后台下载，完成后以本地路径调用
+        on_ready；下载失败则以远程 URL 调用，交给控件自己再试一次。
+        """
+        path = self.local_path(work_id, size)
+        if path:
+            return path
+        task = self._schedule(work_id, size)
+        if on_ready:
+            def _done(t: asyncio.Task):
+                if t.cancelled():
+                    return
+                on_ready(t.result() or self._api.cover_url(work_id, size))
+            task.add_done_callback(_done)
+        return None
+
+    def prefetch(self, work_ids: Iterable[int], size: str = "sam"):
+        """后台预取一批封面。"""
+        for work_id in work_ids:
+            if self._name(work_id, size) not in self._lru:
+                self._schedule(work_id, size)
+
+    def prefetch_page(self, data: dict):
+        """预取一页作品列表（get_works / search 的返回值）的缩略图。"""
+        self.prefetch(w.id for w in data.get("works", []))
+
+    async def fetch(self, work_id: int, size: str = "sam") -> Optional[str]:
+        """确保封面已缓存并返回本地路径，下载失败返回 None。"""
+        path = self.local_path(work_id, size)
+        if path:
+            return path
+        task = self._schedule(work_id, size)
+        return await asyncio.shield(task)
+
+    def _schedule(self, work_id: int, size: str) -> asyncio.Task:
+        name = self._name(work_id, size)
+        task = self._pending.get(name)
+        if task is None:
+            task = asyncio.create_task(self._download(work_id, size))
+            self._pending[name] = task
+            task.add_done_callback(lambda _: self._pending.pop(name, None))
+        return task
+
+    async def _download(self, work_id: int, size: str) -> Optional[str]:
+        name = self._name(work_id, size)
+        await asyncio.shield(self.load())
+        async with self._sem:
+            if name in self._lru:
+                return str(self.root / name)
+            try:
+                data = await self._api.get_cover(work_id, size)
+            except Exception as e:
+                print(f"Cover download failed ({name}): {e}")
+                return None
+
+        path = self.root / name
+        tmp = path.with_suffix(".part")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        self._lru[name] = len(data)
+        self._total += len(data)
+        self._evict()
+        return str(path) if name in self._lru else None
+
+    def _evict(self):
+        while self._total > self.max_bytes and self._lru:
+            name, size = self._lru.popitem(last=False)
+            self._total -= size
+            try:
+                (self.root / name).unlink()
+            except OSError:
+                pass
+
+    def close(self):
+        if self._load_task is not None:
+            self._load_task.cancel()
+        for task in list(self._pending.values()):
+            task.cancel()
+        self._pending.clear()
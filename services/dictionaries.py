@@ -0,0 +1,176 @@
+"""
+标签 / 声优 / 社团字典
+/tags、/vas、/circles 的列表很大，这里只加载一次并持久化到本地。
+名称经 sys.intern 驻留，存成按 ID 排列的紧凑表，并建立前缀（有序数组 + 二分）
+和三元组（子串）索引，供搜索框逐键自动补全使用。
+"""
+
+import asyncio
+import bisect
+import contextlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+from asmr_api import AsmrApi
+from services.storage import data_dir
+
+# 字典类型 -> API 流式方法名（列表很大，边下载边取字段，不保留完整记录）
+KINDS = {
+    "tag": "iter_tags",
+    "va": "iter_vas",
+    "circle": "iter_circles",
+}
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class NameTable:
+    """名称表：ID 与名称平行存放，附带前缀和三元组索引"""
+
+    __slots__ = ("ids", "names", "_prefix_keys", "_prefix_rows", "_trigram")
+
+    def __init__(self, records: Iterable[tuple]):
+        ids, names = [], []
+        for record_id, name in records:
+            if not name:
+                continue
+            ids.append(record_id)
+            names.append(sys.intern(name))
+        self.ids = ids
+        self.names = names
+
+        folded = [n.casefold() for n in names]
+        order = sorted(range(len(names)), key=folded.__getitem__)
+        self._prefix_keys = [folded[i] for i in order]
+        self._prefix_rows = order
+
+        trigram: dict[str, list] = {}
+        for row, text in enumerate(folded):
+            for tri in _trigrams(text):
+                trigram.setdefault(tri, []).append(row)
+        self._trigram = trigram
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def complete(self, text: str, limit: int = 8) -> list:
+        """前缀匹配优先，不足时用三元组索引补充子串匹配。返回名称列表。"""
+        query = text.casefold()
+        if not query:
+            return []
+
+        rows = []
+        i = bisect.bisect_left(self._prefix_keys, query)
+        while i < len(self._prefix_keys) and len(rows) < limit:
+            if not self._prefix_keys[i].startswith(query):
+                break
+            rows.append(self._prefix_rows[i])
+            i += 1
+
+        if len(rows) < limit and len(query) >= 3:
+            postings = sorted((self._trigram.get(t, ()) for t in _trigrams(query)), key=len)
+            if postings and postings[0]:
+                candidates = set(postings[0]).intersection(*postings[1:])
+                seen = set(rows)
+                for row in sorted(candidates):
+                    if row in seen or query not in self.names[row].casefold():
+                        continue
+                    rows.append(row)
+                    if len(rows) >= limit:
+                        break
+        return [self.names[r] for r in rows]
+
+
+class Dictionaries:
+    """标签 / 声优 / 社团字典集合"""
+
+    def __init__(self, api: AsmrApi, path: Optional[Path] = None,
+                 max_age: float = 7 * 24 * 3600):
+        self._api = api
+        self.path = path or data_dir() / "dictionaries.json"
+        self.max_age = max_age
+        self.tables: dict[str, NameTable] = {}
+        self._updated_at: dict[str, float] = {}
+        self._raw: dict[str, list] = {}
+
+    # ── 加载与刷新 ────────────────────────────────────
+
+    async def load(self):
+        """从磁盘加载，过期或缺失的字典再在后台刷新（未登录时沿用磁盘上的旧表）。"""
+        if self.path.exists():
+            try:
+                await asyncio.to_thread(self._load_file)
+            except Exception as e:
+                print(f"Load dictionaries failed: {e}")
+        stale = [
+            kind for kind in KINDS
+            if time.time() - self._updated_at.get(kind, 0) > self.max_age
+        ]
+        if stale:
+            await self.refresh(stale)
+
+    def _load_file(self):
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        for kind, entry in data.items():
+            if kind not in KINDS:
+                continue
+            self._raw[kind] = entry["items"]
+            self._updated_at[kind] = entry["updated_at"]
+            self.tables[kind] = NameTable(entry["items"])
+
+    async def refresh(self, kinds: Optional[Iterable[str]] = None):
+        """从 API 重新拉取字典（需要登录），失败或结果为空的保留旧数据。"""
+        if not self._api.token:
+            # 这些接口需要登录，未登录时每次都会失败：跳过，继续用上次的表
+            print("Skip dictionary refresh: not logged in")
+            return
+        changed = False
+        for kind in kinds or KINDS:
+            try:
+                async with contextlib.aclosing(getattr(self._api, KINDS[kind])()) as stream:
+                    items = [[r.get("id"), r.get("name", "")] async for r in stream]
+            except Exception as e:
+                print(f"Refresh {kind} dictionary failed: {e}")
+                continue
+            if not items and kind in self.tables:
+                print(f"Refresh {kind} dictionary returned nothing, keeping the old table")
+                continue
+            self.tables[kind] = await asyncio.to_thread(NameTable, items)
+            self._raw[kind] = items
+            self._updated_at[kind] = time.time()
+            changed = True
+        if changed:
+            await asyncio.to_thread(self._save_file)
+
+    def _save_file(self):
+        data = {
+            kind: {"updated_at": self._updated_at[kind], "items": self._raw[kind]}
+            for kind in self._raw
+        }
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    # ── 查询 ──────────────────────────────────────────
+
+    def suggest(self, text: str, limit: int = 8) -> list:
+        """自动补全：返回 [(类型, 名称), ...]，各类型轮流取直到 limit。"""
+        text = text.strip()
+        if not text:
+            return []
+        per_kind = [
+            [(kind, name) for name in table.complete(text, limit)]
+            for kind, table in self.tables.items()
+        ]
+        results = []
+        for i in range(limit):
+            for hits in per_kind:
+                if i < len(hits):
+                    results.append(hits[i])
+        return results[:limit]
@@ -0,0 +1,522 @@
+"""
+离线下载管理
+把作品音轨（mediaDownloadUrl）下载到本地：
+- 服务器支持 Range 时按块并行下载，每完成一块记入数据库，中断后只补缺失的块
+- 任务队列持久化在 SQLite，应用重启后自动继续
+- 全局并发数与单个主机并发数分别限制
+- 每块在接收时计算 SHA-256；完成后重读文件逐块比对（不符的块重新下载），
+  并校验总大小；续传前用 ETag / Last-Modified 确认服务器上的文件没有变化
+- 失败的任务保留在队列中，可通过 on_failed 回调和 failed_jobs() 查看并重试
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from services.models import Track
+from services.storage import data_dir
+
+_CONTENT_RANGE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+# 文件名中不允许出现的字符
+_UNSAFE = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+
+@dataclass
+class DownloadJob:
+    """一个下载任务"""
+
+    id: int
+    work_id: int
+    url: str
+    path: str
+    size: Optional[int]
+    sha256: Optional[str]
+    status: str          # queued / running / done / failed
+    error: Optional[str]
+
+
+class DownloadStore:
+    """下载任务与分块进度的持久化"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or data_dir() / "downloads.db"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                work_id INTEGER NOT NULL,
+                url TEXT NOT NULL UNIQUE,
+                path TEXT NOT NULL,
+                size INTEGER,
+                sha256 TEXT,
+                status TEXT NOT NULL,
+                error TEXT,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS chunks (
+                job_id INTEGER NOT NULL,
+                start INTEGER NOT NULL,
+                end INTEGER NOT NULL,
+                done INTEGER NOT NULL DEFAULT 0,
+                sha256 TEXT,
+                PRIMARY KEY (job_id, start)
+            );
+            """
+        )
+        # 旧版本建的表补上新增的列
+        self._add_column("jobs", "validator", "TEXT")
+        self._add_column("chunks", "sha256", "TEXT")
+        self._conn.commit()
+
+    def _add_column(self, table: str, column: str, decl: str):
+        columns = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+    def _execute(self, sql: str, args=()):
+        with self._lock:
+            cur = self._conn.execute(sql, args)
+            self._conn.commit()
+            return cur
+
+    def add(self, work_id: int, url: str, path: str) -> Optional[int]:
+        """加入队列；同一 URL 已存在时，只有失败的任务会被重新排队。"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status FROM jobs WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                cur = self._conn.execute(
+                    "INSERT INTO jobs (work_id, url, path, status, created_at) "
+                    "VALUES (?, ?, ?, 'queued', ?)",
+                    (work_id, url, path, time.time()),
+                )
+                self._conn.commit()
+                return cur.lastrowid
+            if row[1] == "failed":
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'queued', error = NULL WHERE id = ?", (row[0],)
+                )
+                self._conn.commit()
+                return row[0]
+        return None
+
+    def next_queued(self, exclude: Iterable[int]) -> Optional[DownloadJob]:
+        exclude = list(exclude)
+        skip = f"AND id NOT IN ({','.join('?' * len(exclude))})" if exclude else ""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT * FROM jobs WHERE status = 'queued' {skip} ORDER BY id LIMIT 1",
+                exclude,
+            ).fetchone()
+        return DownloadJob(*row[:8]) if row else None
+
+    def by_url(self, url: str) -> Optional[DownloadJob]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE url = ?", (url,)).fetchone()
+        return DownloadJob(*row[:8]) if row else None
+
+    def failed(self, work_id: Optional[int] = None) -> list:
+        """失败的任务（可只看某个作品）。"""
+        where, args = "status = 'failed'", []
+        if work_id is not None:
+            where += " AND work_id = ?"
+            args.append(work_id)
+        with self._lock:
+            rows = self._conn.execute(f"SELECT * FROM jobs WHERE {where} ORDER BY id", args)
+            return [DownloadJob(*row[:8]) for row in rows]
+
+    def set_status(self, job_id: int, status: str, error: Optional[str] = None):
+        self._execute("UPDATE jobs SET status = ?, error = ? WHERE id = ?",
+                      (status, error, job_id))
+
+    def finish(self, job_id: int, size: int, sha256: str):
+        self._execute(
+            "UPDATE jobs SET status = 'done', size = ?, sha256 = ?, error = NULL WHERE id = ?",
+            (size, sha256, job_id),
+        )
+        self._execute("DELETE FROM chunks WHERE job_id = ?", (job_id,))
+
+    def requeue_running(self):
+        """应用上次退出时仍在下载的任务重新排队（分块进度保留）。"""
+        self._execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'")
+
+    # ── 分块 ──────────────────────────────────────────
+
+    def plan(self, job_id: int, size: int, chunk_size: int, validator: Optional[str]):
+        """按 chunk_size 切分文件并记录，覆盖原有计划。validator 为服务器文件的 ETag 等。"""
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks WHERE job_id = ?", (job_id,))
+            self._conn.executemany(
+                "INSERT INTO chunks (job_id, start, end) VALUES (?, ?, ?)",
+                [(job_id, s, min(s + chunk_size, size) - 1) for s in range(0, size, chunk_size)],
+            )
+            self._conn.execute(
+                "UPDATE jobs SET size = ?, validator = ? WHERE id = ?", (size, validator, job_id)
+            )
+            self._conn.commit()
+
+    def validator(self, job_id: int) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT validator FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def chunks(self, job_id: int) -> list:
+        """全部分块 [(start, end, sha256), ...]，按位置排序。"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT start, end, sha256 FROM chunks WHERE job_id = ? ORDER BY start",
+                (job_id,),
+            ).fetchall()
+
+    def pending_chunks(self, job_id: int) -> list:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT start, end FROM chunks WHERE job_id = ? AND done = 0 ORDER BY start",
+                (job_id,),
+            ).fetchall()
+
+    def has_plan(self, job_id: int) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM chunks WHERE job_id = ? LIMIT 1", (job_id,)
+            ).fetchone() is not None
+
+    def chunk_done(self, job_id: int, start: int, sha256: str):
+        self._execute("UPDATE chunks SET done = 1, sha256 = ? WHERE job_id = ? AND start = ?",
+                      (sha256, job_id, start))
+
+    def redo_chunks(self, job_id: int, starts: Iterable[int]):
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE chunks SET done = 0, sha256 = NULL WHERE job_id = ? AND start = ?",
+                [(job_id, start) for start in starts],
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _safe_name(name: str) -> str:
+    return _UNSAFE.sub("_", name).strip() or "未知"
+
+
+def track_url(item: Track) -> str:
+    """音轨用于下载（及识别已下载文件）的 URL。"""
+    return item.download_url or item.stream_url
+
+
+def flatten_tracks(items: list, prefix: str = "") -> list:
+    """把音轨树展开为 [(相对路径, 下载 URL), ...]，保持文件夹顺序。"""
+    files = []
+    for item in items:
+        title = _safe_name(item.title)
+        if item.is_folder:
+            files.extend(flatten_tracks(item.children, f"{prefix}{title}/"))
+        else:
+            url = track_url(item)
+            if url:
+                files.append((f"{prefix}{title}", url))
+    return files
+
+
+class DownloadManager:
+    """下载管理器"""
+
+    def __init__(self, root: Optional[Path] = None, store: Optional[DownloadStore] = None,
+                 max_concurrency: int = 3, per_host: int = 2, parts: int = 4,
+                 chunk_size: int = 4 * 1024 * 1024,
+                 on_failed: Optional[Callable[[DownloadJob, str], None]] = None):
+        """
+        参数:
+            root: 下载目录
+            store: 任务持久化
+            max_concurrency: 同时下载的文件数
+            per_host: 同一主机同时下载的文件数
+            parts: 单个文件的并行分块数
+            chunk_size: 分块大小（也是断点续传的粒度）
+            on_failed: 任务失败回调 (任务, 错误信息)
+        """
+        self.root = root or data_dir() / "downloads"
+        self.store = store or DownloadStore()
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.parts = parts
+        self.chunk_size = chunk_size
+        self.on_failed = on_failed
+        self._client: Optional[httpx.AsyncClient] = None
+        self._global: Optional[asyncio.Semaphore] = None
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+        self._active: dict[int, asyncio.Task] = {}
+        self._wake: Optional[asyncio.Event] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    # ── 生命周期 ──────────────────────────────────────
+
+    async def start(self):
+        """启动调度循环，并恢复上次未完成的任务。"""
+        if self._loop_task is not None:
+            return
+        # 媒体文件走独立连接池，避免长时间下载占满 API 连接
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, read=60.0),
+            follow_redirects=True,
+            headers={"User-Agent": "AsmrApi/1.0"},
+        )
+        self._global = asyncio.Semaphore(self.max_concurrency)
+        self._wake = asyncio.Event()
+        self.store.requeue_running()
+        self._loop_task = asyncio.create_task(self._loop())
+
+    async def aclose(self):
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            self._loop_task = None
+        for task in list(self._active.values()):
+            task.cancel()
+        await asyncio.gather(*self._active.values(), return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self.store.close()
+
+    # ── 入队与查询 ────────────────────────────────────
+
+    def enqueue_tracks(self, work_id: int, items: list, prefix: str = "") -> int:
+        """
+        把音轨树（或其中一个文件夹）里的所有文件加入队列，返回新入队数量。
+        prefix 为文件夹在作品内的路径，如 "MP3/本編/"。
+        """
+        prefix = "".join(f"{_safe_name(part)}/" for part in prefix.split("/") if part)
+        count = 0
+        for rel_path, url in flatten_tracks(items, prefix):
+            if self.store.add(work_id, url, f"RJ{work_id:06d}/{rel_path}") is not None:
+                count += 1
+        if count and self._wake is not None:
+            self._wake.set()
+        return count
+
+    def local_path(self, url: str) -> Optional[str]:
+        """该 URL 已下载完成且文件大小与记录一致则返回本地路径。"""
+        job = self.store.by_url(url)
+        if job is None or job.status != "done":
+            return None
+        path = self.root / job.path
+        try:
+            if job.size is not None and path.stat().st_size != job.size:
+                return None
+        except OSError:
+            return None
+        return str(path)
+
+    def failed_jobs(self, work_id: Optional[int] = None) -> list:
+        return self.store.failed(work_id)
+
+    def retry_failed(self, work_id: Optional[int] = None) -> int:
+        """失败的任务重新排队，返回数量。"""
+        count = 0
+        for job in self.store.failed(work_id):
+            if self.store.add(job.work_id, job.url, job.path) is not None:
+                count += 1
+        if count and self._wake is not None:
+            self._wake.set()
+        return count
+
+    # ── 调度 ──────────────────────────────────────────
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).hostname or ""
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return self._hosts[host]
+
+    async def _loop(self):
+        while True:
+            job = self.store.next_queued(self._active)
+            if job is None:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            await self._global.acquire()
+            self.store.set_status(job.id, "running")
+            task = asyncio.create_task(self._run(job))
+            self._active[job.id] = task
+
+    async def _run(self, job: DownloadJob):
+        try:
+            async with self._host_slot(job.url):
+                size, sha256 = await self._download(job)
+            self.store.finish(job.id, size, sha256)
+        except asyncio.CancelledError:
+            self.store.set_status(job.id, "queued")
+            raise
+        except Exception as e:
+            print(f"Download failed ({job.path}): {e}")
+            self.store.set_status(job.id, "failed", str(e))
+            if self.on_failed:
+                try:
+                    self.on_failed(job, str(e))
+                except Exception as ex:
+                    print(f"Download failure callback failed: {ex}")
+        finally:
+            self._active.pop(job.id, None)
+            self._global.release()
+            self._wake.set()
+
+    # ── 下载 ──────────────────────────────────────────
+
+    async def _probe(self, url: str) -> tuple:
+        """
+        请求第一个字节，返回 (文件大小或 None, 是否支持 Range, 校验标识)。
+        校验标识是强 ETag 或 Last-Modified，用来判断续传时服务器文件是否变了。
+        """
+        async with self._client.stream("GET", url, headers={"Range": "bytes=0-0"}) as resp:
+            resp.raise_for_status()
+            etag = resp.headers.get("ETag")
+            validator = etag if etag and not etag.startswith("W/") else \
+                resp.headers.get("Last-Modified")
+            if resp.status_code == 206:
+                m = _CONTENT_RANGE.match(resp.headers.get("Content-Range", ""))
+                if m and m.group(3) != "*":
+                    return int(m.group(3)), True, validator
+            length = resp.headers.get("Content-Length")
+            return (int(length) if length and resp.status_code == 200 else None), False, validator
+
+    async def _download(self, job: DownloadJob) -> tuple:
+        """下载并校验，返回 (文件大小, SHA-256)。"""
+        dest = self.root / job.path
+        part = dest.with_name(dest.name + ".part")
+        dest.parent.mkdir(parents=True, exist_ok=True)
+
+        size, ranged, validator = await self._probe(job.url)
+        if ranged and size:
+            resumable = (
+                job.size == size and part.exists() and self.store.has_plan(job.id)
+                and self.store.validator(job.id) == validator
+            )
+            if not resumable:
+                self.store.plan(job.id, size, self.chunk_size, validator)
+                with open(part, "wb") as f:
+                    f.truncate(size)
+            sha256 = await self._download_verified_chunks(job, part, validator)
+        else:
+            size, sha256 = await self._download_whole(job, part)
+
+        actual = part.stat().st_size
+        if size is not None and actual != size:
+            raise IOError(f"大小不符：期望 {size}，实际 {actual}")
+        os.replace(part, dest)
+        return actual, sha256
+
+    async def _download_verified_chunks(self, job: DownloadJob, part: Path,
+                                        validator: Optional[str], rounds: int = 2) -> str:
+        """
+        下载缺失的块，再重读整个文件逐块比对接收时的摘要。
+        不符的块（包括上次中断前没写到磁盘的）重新下载，最多 rounds 轮。
+        """
+        for _ in range(rounds):
+            await self._download_chunks(job, part, validator)
+            sha256, bad = await asyncio.to_thread(self._verify_chunks, job.id, part)
+            if not bad:
+                return sha256
+            print(f"Download verify ({job.path}): {len(bad)} 个分块不符，重新下载")
+            self.store.redo_chunks(job.id, bad)
+        raise IOError(f"校验失败：{len(bad)} 个分块与下载时的摘要不符")
+
+    def _verify_chunks(self, job_id: int, part: Path) -> tuple:
+        """返回 (整个文件的 SHA-256, 摘要不符的分块起点列表)。"""
+        whole = hashlib.sha256()
+        bad = []
+        with open(part, "rb") as f:
+            for start, end, expected in self.store.chunks(job_id):
+                f.seek(start)
+                data = f.read(end - start + 1)
+                whole.update(data)
+                if expected is None or hashlib.sha256(data).hexdigest() != expected:
+                    bad.append(start)
+        return whole.hexdigest(), bad
+
+    async def _download_chunks(self, job: DownloadJob, part: Path, validator: Optional[str]):
+        queue: asyncio.Queue = asyncio.Queue()
+        for chunk in self.store.pending_chunks(job.id):
+            queue.put_nowait(chunk)
+
+        async def worker():
+            with open(part, "r+b") as f:
+                while not queue.empty():
+                    start, end = queue.get_nowait()
+                    digest = await self._fetch_range(job.url, f, start, end, validator)
+                    self.store.chunk_done(job.id, start, digest)
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.parts, queue.qsize()))]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for w in workers:
+                w.cancel()
+            raise
+
+    async def _fetch_range(self, url: str, f, start: int, end: int,
+                           validator: Optional[str] = None) -> str:
+        """下载一个分块写入文件，返回接收到的数据的 SHA-256。"""
+        headers = {"Range": f"bytes={start}-{end}"}
+        if validator:
+            # 服务器文件已变化时返回 200 整个文件，而不是拼上不同版本的数据
+            headers["If-Range"] = validator
+        digest = hashlib.sha256()
+        async with self._client.stream("GET", url, headers=headers) as resp:
+            if resp.status_code != 206:
+                raise IOError(f"服务器未按 Range 返回 (HTTP {resp.status_code})")
+            pos = start
+            async for data in resp.aiter_bytes():
+                f.seek(pos)
+                f.write(data)
+                digest.update(data)
+                pos += len(data)
+        if pos != end + 1:
+            raise IOError(f"分块不完整：{start}-{end} 只收到 {pos - start} 字节")
+        return digest.hexdigest()
+
+    async def _download_whole(self, job: DownloadJob, part: Path) -> tuple:
+        """
+        服务器不支持 Range：整体下载（无法续传）。
+        返回 (期望大小或 None, SHA-256)；重读文件与接收时的摘要比对。
+        """
+        digest = hashlib.sha256()
+        async with self._client.stream("GET", job.url) as resp:
+            resp.raise_for_status()
+            # 压缩传输时 Content-Length 不是解压后的大小，无法用来校验
+            length = None if resp.headers.get("Content-Encoding") else resp.headers.get("Content-Length")
+            with open(part, "wb") as f:
+                async for data in resp.aiter_bytes():
+                    f.write(data)
+                    digest.update(data)
+        sha256 = digest.hexdigest()
+        if await asyncio.to_thread(_file_sha256, part) != sha256:
+            raise IOError("校验失败：写入的文件与下载内容不符")
+        return (int(length) if length else None), sha256
+
+
+def _file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
@@ -0,0 +1,104 @@
+"""
+流式 JSON 数组解析
+响应体是一个顶层数组时，边接收字节边切出完整的元素并解析，
+不必等整个响应下载完，也不必一次性把整棵对象树放进内存。
+"""
+
+import codecs
+import json
+import re
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r"\s*")
+
+
+class JsonArrayStream:
+    """
+    增量解析顶层 JSON 数组。
+
+        parser = JsonArrayStream()
+        for chunk in chunks:
+            for item in parser.feed(chunk):
+                ...
+        for item in parser.close():
+            ...
+
+    每个元素用 C 实现的 raw_decode 解析；元素还没收完时解析会失败，
+    此时等缓冲区增长到一倍再重试，保证总开销与数据量成线性。
+    """
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._started = False
+        self._done = False
+        self._count = 0  # 已解析的元素数
+        self._after_item = False  # 刚解析完一个元素，下一个必须是 , 或 ]
+        self._need = 0  # 下次尝试解析前，待解析部分至少要有的长度
+
+    def feed(self, data: bytes) -> list:
+        """送入一段字节，返回其中已完整的元素。"""
+        self._buf += self._decoder.decode(data)
+        return self._scan()
+
+    def close(self) -> list:
+        """输入结束。数组不完整时抛 ValueError。"""
+        self._buf += self._decoder.decode(b"", final=True)
+        items = self._scan(final=True)
+        if not self._done:
+            raise ValueError("JSON 数组不完整")
+        return items
+
+    def _scan(self, final: bool = False) -> list:
+        items = []
+        buf, pos = self._buf, 0
+        if not self._started:
+            pos = _WHITESPACE.match(buf).end()
+            if pos >= len(buf):
+                self._buf = ""
+                return items
+            if buf[pos] != "[":
+                raise ValueError("响应不是 JSON 数组")
+            self._started = True
+            pos += 1
+
+        while not self._done:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos >= len(buf):
+                break
+            char = buf[pos]
+            if self._after_item:
+                if char == ",":
+                    self._after_item = False
+                    pos += 1
+                    continue
+                if char != "]":
+                    raise ValueError(f"JSON 数组元素之间缺少逗号：{char!r}")
+            elif char == "," or (char == "]" and self._count):
+                # [1,,2]、[,1]、[1,] 都不是合法的 JSON
+                raise ValueError("JSON 数组中多余的逗号")
+            if char == "]":
+                self._done = True
+                pos += 1
+                break
+            if not final and len(buf) - pos < self._need:
+                break
+            try:
+                item, end = _DECODER.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if final:
+                    break
+                self._need = 2 * (len(buf) - pos)
+                break
+            if end >= len(buf) and not final:
+                # 停在缓冲区末尾的可能是被截断的数字，等后续数据确认
+                self._need = len(buf) - pos + 1
+                break
+            items.append(item)
+            pos = end
+            self._need = 0
+            self._count += 1
+            self._after_item = True
+
+        self._buf = buf[pos:]
+        return items
@@ -0,0 +1,182 @@
+"""
+性能统计
+按接口记录每次请求的耗时、字节数、状态码、重试次数和缓存命中情况，
+另有通用耗时统计（界面刷新、启动耗时等）。
+耗时同时进直方图桶（导出 Prometheus 格式）和最近样本窗口（计算 p50/p95/p99）。
+"""
+
+import bisect
+import json
+import math
+import os
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Optional
+
+from services.storage import data_dir
+
+# 直方图桶上界（秒）
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """耗时直方图 + 最近样本窗口"""
+
+    __slots__ = ("counts", "sum", "count", "_recent")
+
+    def __init__(self, window: int = 1024):
+        self.counts = [0] * (len(BUCKETS) + 1)  # 最后一格是 +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._recent: deque = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+        self._recent.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """最近样本的分位数（秒），无样本返回 None。"""
+        if not self._recent:
+            return None
+        ordered = sorted(self._recent)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class EndpointStats:
+    """单个接口的统计"""
+
+    __slots__ = ("latency", "bytes", "retries", "statuses", "cache")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.bytes = 0
+        self.retries = 0
+        self.statuses: Counter = Counter()
+        self.cache: Counter = Counter()  # hit / stale / miss / not_modified / fallback
+
+    @property
+    def errors(self) -> int:
+        return sum(n for s, n in self.statuses.items() if not str(s).startswith(("2", "3")))
+
+    def summary(self) -> dict:
+        return {
+            **self.latency.summary(),
+            "bytes": self.bytes,
+            "retries": self.retries,
+            "errors": self.errors,
+            "statuses": {str(k): v for k, v in self.statuses.items()},
+            "cache": dict(self.cache),
+        }
+
+
+class Metrics:
+    """应用内性能统计"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.endpoints: dict[str, EndpointStats] = {}
+        self.timings: dict[str, Histogram] = {}
+
+    def _endpoint(self, endpoint: str) -> EndpointStats:
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = EndpointStats()
+        return stats
+
+    # ── 记录 ──────────────────────────────────────────
+
+    def record_request(self, endpoint: str, seconds: float, status, nbytes: int = 0,
+                       retries: int = 0):
+        """记录一次网络请求（含重试的总耗时）。status 为状态码或错误类型。"""
+        stats = self._endpoint(endpoint)
+        stats.latency.observe(seconds)
+        stats.bytes += nbytes
+        stats.retries += retries
+        stats.statuses[status] += 1
+
+    def record_cache(self, endpoint: str, result: str):
+        self._endpoint(endpoint).cache[result] += 1
+
+    def observe(self, name: str, seconds: float):
+        """记录一次通用耗时。"""
+        hist = self.timings.get(name)
+        if hist is None:
+            hist = self.timings[name] = Histogram()
+        hist.observe(seconds)
+
+    # ── 导出 ──────────────────────────────────────────
+
+    def snapshot(self) -> dict:
+        return {
+            "started_at": self.started_at,
+            "uptime": round(time.time() - self.started_at, 3),
+            "endpoints": {k: v.summary() for k, v in sorted(self.endpoints.items())},
+            "timings": {k: v.summary() for k, v in sorted(self.timings.items())},
+        }
+
+    def to_prometheus(self) -> str:
+        """Prometheus 文本格式。"""
+        lines = [
+            "# TYPE asmr_request_seconds histogram",
+        ]
+        for endpoint, stats in sorted(self.endpoints.items()):
+            lines += _histogram_lines("asmr_request_seconds", f'endpoint="{endpoint}"',
+                                      stats.latency)
+        lines.append("# TYPE asmr_request_bytes_total counter")
+        for endpoint, stats in sorted(self.endpoints.items()):
+            lines.append(f'asmr_request_bytes_total{{endpoint="{endpoint}"}} {stats.bytes}')
+        lines.append("# TYPE asmr_request_retries_total counter")
+        for endpoint, stats in sorted(self.endpoints.items()):
+            lines.append(f'asmr_request_retries_total{{endpoint="{endpoint}"}} {stats.retries}')
+        lines.append("# TYPE asmr_requests_total counter")
+        for endpoint, stats in sorted(self.endpoints.items()):
+            for status, n in sorted(stats.statuses.items(), key=lambda x: str(x[0])):
+                lines.append(
+                    f'asmr_requests_total{{endpoint="{endpoint}",status="{status}"}} {n}'
+                )
+        lines.append("# TYPE asmr_cache_total counter")
+        for endpoint, stats in sorted(self.endpoints.items()):
+            for result, n in sorted(stats.cache.items()):
+                lines.append(
+                    f'asmr_cache_total{{endpoint="{endpoint}",result="{result}"}} {n}'
+                )
+        lines.append("# TYPE asmr_timing_seconds histogram")
+        for name, hist in sorted(self.timings.items()):
+            lines += _histogram_lines("asmr_timing_seconds", f'name="{name}"', hist)
+        return "\n".join(lines) + "\n"
+
+    def export(self, directory: Optional[Path] = None) -> Path:
+        """写出 metrics.json 和 metrics.prom，返回所在目录。"""
+        directory = directory or data_dir() / "metrics"
+        directory.mkdir(parents=True, exist_ok=True)
+        for name, text in (
+            ("metrics.json", json.dumps(self.snapshot(), ensure_ascii=False, indent=2)),
+            ("metrics.prom", self.to_prometheus()),
+        ):
+            tmp = directory / f"{name}.tmp"
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, directory / name)
+        return directory
+
+
+def _histogram_lines(metric: str, labels: str, hist: Histogram) -> list:
+    lines, cumulative = [], 0
+    for bound, n in zip(BUCKETS + (math.inf,), hist.counts):
+        cumulative += n
+        le = "+Inf" if bound == math.inf else f"{bound:g}"
+        lines.append(f'{metric}_bucket{{{labels},le="{le}"}} {cumulative}')
+    lines.append(f"{metric}_sum{{{labels}}} {hist.sum:.6f}")
+    lines.append(f"{metric}_count{{{labels}}} {hist.count}")
+    return lines
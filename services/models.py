@@ -0,0 +1,165 @@
+"""
+数据模型
+API 返回的作品和音轨 JSON 字段很多，界面只用其中一小部分。这里把它们转成
+带 __slots__ 的紧凑对象，只保留用到的字段；社团和标签名经 sys.intern 驻留，
+同一个社团 / 标签在所有作品间共享同一个对象。
+
+from_json 接受 API 的原始结构，to_json 写回同样结构的子集（快照、本地目录
+和索引里存的就是它），两者可以互相往返。
+"""
+
+import sys
+from typing import Optional
+
+
+class Circle:
+    """社团"""
+
+    __slots__ = ("id", "name")
+
+    _shared: dict = {}
+
+    def __init__(self, id: int, name: str):
+        self.id = id
+        self.name = name
+
+    @classmethod
+    def of(cls, id: int, name: str) -> "Circle":
+        """返回共享实例，相同的 (id, name) 只创建一次。"""
+        circle = cls._shared.get((id, name))
+        if circle is None:
+            circle = cls._shared[(id, name)] = cls(id, sys.intern(name))
+        return circle
+
+    def __repr__(self) -> str:
+        return f"Circle({self.id!r}, {self.name!r})"
+
+
+class Tag:
+    """标签"""
+
+    __slots__ = ("id", "name")
+
+    _shared: dict = {}
+
+    def __init__(self, id: int, name: str):
+        self.id = id
+        self.name = name
+
+    @classmethod
+    def of(cls, id: int, name: str) -> "Tag":
+        """返回共享实例，相同的 (id, name) 只创建一次。"""
+        tag = cls._shared.get((id, name))
+        if tag is None:
+            tag = cls._shared[(id, name)] = cls(id, sys.intern(name))
+        return tag
+
+    def __repr__(self) -> str:
+        return f"Tag({self.id!r}, {self.name!r})"
+
+
+_NO_CIRCLE = Circle(0, "")
+
+
+class Work:
+    """作品（列表、详情页、快照、本地目录共用）"""
+
+    __slots__ = ("id", "title", "circle", "tags", "rate", "dl_count", "price",
+                 "review_count", "release", "create_date", "has_subtitle")
+
+    def __init__(self, id: int, title: str = "未知作品", circle: Circle = _NO_CIRCLE,
+                 tags: tuple = (), rate: float = 0, dl_count: int = 0, price: int = 0,
+                 review_count: int = 0, release: Optional[str] = None,
+                 create_date: Optional[str] = None, has_subtitle: bool = False):
+        self.id = id
+        self.title = title
+        self.circle = circle
+        self.tags = tags
+        self.rate = rate
+        self.dl_count = dl_count
+        self.price = price
+        self.review_count = review_count
+        self.release = release
+        self.create_date = create_date
+        self.has_subtitle = has_subtitle
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Work":
+        circle = data.get("circle") or {}
+        circle_id = circle.get("id", data.get("circle_id", 0))
+        circle_name = circle.get("name") or data.get("name") or ""
+        return cls(
+            id=data.get("id", 0),
+            title=data.get("title", "未知作品"),
+            circle=Circle.of(circle_id, circle_name) if circle_id or circle_name else _NO_CIRCLE,
+            tags=tuple(
+                Tag.of(t.get("id", 0), t.get("name", "")) if isinstance(t, dict)
+                else Tag.of(0, str(t))
+                for t in data.get("tags") or ()
+            ),
+            rate=data.get("rate_average_2dp") or 0,
+            dl_count=data.get("dl_count") or 0,
+            price=data.get("price") or 0,
+            review_count=data.get("review_count") or 0,
+            release=data.get("release"),
+            create_date=data.get("create_date"),
+            has_subtitle=bool(data.get("has_subtitle")),
+        )
+
+    def to_json(self) -> dict:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "circle_id": self.circle.id,
+            "name": self.circle.name,
+            "circle": {"id": self.circle.id, "name": self.circle.name},
+            "tags": [{"id": t.id, "name": t.name} for t in self.tags],
+            "rate_average_2dp": self.rate,
+            "dl_count": self.dl_count,
+            "price": self.price,
+            "review_count": self.review_count,
+            "release": self.release,
+            "create_date": self.create_date,
+            "has_subtitle": self.has_subtitle,
+        }
+
+    def __repr__(self) -> str:
+        return f"Work({self.id!r}, {self.title!r})"
+
+
+class Track:
+    """音轨树的一个节点（文件或文件夹）"""
+
+    __slots__ = ("type", "title", "duration", "stream_url", "download_url", "children")
+
+    def __init__(self, type: str, title: str = "未知", duration: float = 0,
+                 stream_url: str = "", download_url: str = "", children: tuple = ()):
+        self.type = type
+        self.title = title
+        self.duration = duration
+        self.stream_url = stream_url
+        self.download_url = download_url
+        self.children = children
+
+    @property
+    def is_folder(self) -> bool:
+        return self.type == "folder"
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Track":
+        return cls(
+            type=sys.intern(data.get("type") or ""),
+            title=data.get("title", "未知"),
+            duration=data.get("duration") or 0,
+            stream_url=data.get("mediaStreamUrl") or "",
+            download_url=data.get("mediaDownloadUrl") or "",
+            children=tuple(cls.from_json(c) for c in data.get("children") or ()),
+        )
+
+    @classmethod
+    def tree(cls, items: list) -> list:
+        """把 get_tracks 的原始 JSON 列表转成 Track 列表。"""
+        return [cls.from_json(item) for item in items]
+
+    def __repr__(self) -> str:
+        return f"Track({self.type!r}, {self.title!r})"
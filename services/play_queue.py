@@ -0,0 +1,87 @@
+"""
+播放队列
+按音轨树的文件夹顺序展开，只保留音频文件。
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from services.models import Track
+
+AUDIO_EXTS = (".mp3", ".wav", ".flac", ".m4a", ".ogg", ".aac")
+
+
+def is_audio(title: str) -> bool:
+    return title.lower().endswith(AUDIO_EXTS)
+
+
+@dataclass(frozen=True)
+class QueueItem:
+    track: Track
+    title: str
+
+
+def default_url(track: Track) -> str:
+    return track.stream_url or track.download_url
+
+
+def build_queue(tracks: list) -> list:
+    """
+    把音轨树展开为 QueueItem 列表（深度优先，保持文件夹内顺序）。
+    播放地址在这里不解析（可能要查本地下载记录），准备播放某一首时才由
+    PlayQueue.url_of 解析。
+
+    参数:
+        tracks: get_tracks 返回的音轨树
+    """
+    items = []
+    for item in tracks:
+        if item.is_folder:
+            items.extend(build_queue(item.children))
+        elif (item.stream_url or item.download_url) and is_audio(item.title):
+            items.append(QueueItem(item, item.title))
+    return items
+
+
+class PlayQueue:
+    """播放队列：当前位置 + 顺序前进"""
+
+    def __init__(self, items: list, index: int = 0,
+                 resolve: Optional[Callable[[Track], str]] = None):
+        """
+        参数:
+            items: build_queue 的结果
+            index: 当前位置
+            resolve: 从音轨得到播放地址的函数，默认取 stream_url
+        """
+        self.items = items
+        self.index = index
+        self.resolve = resolve or default_url
+
+    def index_of(self, track: Track) -> int:
+        for i, item in enumerate(self.items):
+            if item.track is track:
+                return i
+        return -1
+
+    def url_of(self, item: QueueItem) -> str:
+        return self.resolve(item.track)
+
+    @property
+    def current(self) -> Optional[QueueItem]:
+        if 0 <= self.index < len(self.items):
+            return self.items[self.index]
+        return None
+
+    @property
+    def next(self) -> Optional[QueueItem]:
+        if 0 <= self.index + 1 < len(self.items):
+            return self.items[self.index + 1]
+        return None
+
+    def advance(self) -> Optional[QueueItem]:
+        """移到下一首并返回它；已是最后一首则返回 None。"""
+        if self.next is None:
+            return None
+        self.index += 1
+        return self.current
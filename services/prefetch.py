@@ -0,0 +1,101 @@
+"""
+分页预取
+当前页渲染后在后台请求后续页，"加载更多" 时直接取已就绪的结果。
+预取深度随用户翻页速度自适应；切换排序或关键词时调用 reset() 丢弃旧结果。
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+PageFetcher = Callable[[int], Awaitable[dict]]
+
+
+class PagePrefetcher:
+    """分页结果预取器"""
+
+    def __init__(self, fetch: PageFetcher, max_depth: int = 3,
+                 on_prefetched: Optional[Callable[[dict], None]] = None):
+        self._fetch = fetch
+        self.max_depth = max_depth
+        self.on_prefetched = on_prefetched
+        self._tasks: dict[int, asyncio.Task] = {}
+        self._last_page_at: Optional[float] = None
+        self._interval: Optional[float] = None  # 翻页间隔的指数滑动平均（秒）
+        self._exhausted_at: Optional[int] = None
+
+    # ── 数据源 ────────────────────────────────────────
+
+    def reset(self, fetch: Optional[PageFetcher] = None):
+        """取消并丢弃所有预取结果，可同时更换数据源（新排序 / 新关键词）。"""
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._last_page_at = None
+        self._interval = None
+        self._exhausted_at = None
+        if fetch is not None:
+            self._fetch = fetch
+
+    # ── 取页 ──────────────────────────────────────────
+
+    def ready(self, page: int) -> bool:
+        """该页是否已预取完成（可立即返回）。"""
+        task = self._tasks.get(page)
+        return task is not None and task.done() and not task.cancelled() \
+            and task.result() is not None
+
+    async def get(self, page: int) -> dict:
+        """取某一页：命中预取则直接用，否则发起请求。"""
+        self._record_pace()
+        # 已经翻过的页不再需要
+        for p in [p for p in self._tasks if p < page]:
+            self._tasks.pop(p).cancel()
+
+        task = self._tasks.pop(page, None)
+        if task is not None:
+            data = await task
+            if data is not None:
+                return data
+        # 未预取或预取失败，直接请求
+        return await self._fetch(page)
+
+    def schedule_after(self, page: int):
+        """在后台预取 page 之后的若干页。"""
+        for p in range(page + 1, page + 1 + self.depth):
+            if self._exhausted_at is not None and p > self._exhausted_at:
+                break
+            if p not in self._tasks:
+                self._tasks[p] = asyncio.create_task(self._prefetch(p))
+
+    async def _prefetch(self, page: int) -> Optional[dict]:
+        try:
+            data = await self._fetch(page)
+        except Exception as e:
+            print(f"Prefetch page {page} failed: {e}")
+            return None
+        if not data.get("works"):
+            self._exhausted_at = page
+        elif self.on_prefetched:
+            self.on_prefetched(data)
+        return data
+
+    # ── 自适应深度 ────────────────────────────────────
+
+    @property
+    def depth(self) -> int:
+        """翻页越快预取越深：<3s 一页用最大深度，<10s 两页，否则一页。"""
+        if self._interval is None:
+            return 1
+        if self._interval < 3:
+            return self.max_depth
+        if self._interval < 10:
+            return min(2, self.max_depth)
+        return 1
+
+    def _record_pace(self):
+        now = time.monotonic()
+        if self._last_page_at is not None:
+            gap = now - self._last_page_at
+            self._interval = gap if self._interval is None else 0.5 * self._interval + 0.5 * gap
+        self._last_page_at = now
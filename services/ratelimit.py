@@ -0,0 +1,45 @@
+"""
+令牌桶限速
+以固定速率补充令牌，允许短时突发（不超过桶容量）。
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """异步令牌桶"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        参数:
+            rate: 每秒补充的令牌数
+            capacity: 桶容量（允许的突发量），默认等于 rate
+        """
+        if rate <= 0:
+            raise ValueError("rate 必须大于 0")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """不等待：有足够令牌则扣除并返回 True。"""
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    async def acquire(self, tokens: float = 1.0):
+        """等待直到拿到令牌。"""
+        async with self._lock:
+            while not self.try_acquire(tokens):
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
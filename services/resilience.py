@@ -0,0 +1,142 @@
+"""
+请求容错
+- RetryPolicy：指数退避 + 全抖动，只用于幂等的 GET
+- retry_after：解析 429 / 503 响应的 Retry-After
+- CircuitBreaker：连续失败达到阈值后熔断，一段时间内直接失败，不再打到后端
+- BreakerGroup：按接口分别熔断，一个接口故障不影响其他接口
+"""
+
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+
+# 值得重试的状态码
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(Exception):
+    """熔断中，请求未发出"""
+
+    def __init__(self, retry_in: float):
+        super().__init__(f"服务暂时不可用，{retry_in:.0f} 秒后重试")
+        self.retry_in = retry_in
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """重试策略（单位：秒）"""
+
+    attempts: int = 3           # 总尝试次数（含第一次）
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    max_retry_after: float = 30.0  # 服务器要求等待更久时不再重试
+
+    def delay(self, attempt: int) -> float:
+        """第 attempt 次失败后的等待时间：[0, base * 2^(attempt-1)] 内均匀随机。"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+def retry_after(resp: httpx.Response) -> Optional[float]:
+    """解析 Retry-After（秒数或 HTTP 日期），无法解析返回 None。"""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_backend_failure(exc: BaseException) -> bool:
+    """请求最终失败的异常是否计入熔断：传输错误和可重试状态码算，4xx 等不算。"""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRY_STATUSES
+    return isinstance(exc, httpx.TransportError)
+
+
+class CircuitBreaker:
+    """
+    熔断器
+    closed: 正常放行；连续失败 failure_threshold 次后转为 open
+    open: 直接抛 CircuitOpenError；reset_timeout 秒后转为 half-open
+    half-open: 只放行一个试探请求，其余直接失败；试探成功则恢复 closed，失败则重新 open
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False  # half-open 时是否已有试探请求在进行
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return "open"
+        return "half-open"
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == "open"
+
+    def allow(self) -> bool:
+        """
+        熔断中（或 half-open 时已有试探请求在进行）则抛出 CircuitOpenError。
+        返回 True 表示本次请求是 half-open 的试探请求：它的重试不必再调用 allow，
+        结束时必须调用 record_success / record_failure / release 之一。
+        """
+        state = self.state
+        if state == "open":
+            raise CircuitOpenError(self.reset_timeout - (time.monotonic() - self._opened_at))
+        if state == "half-open":
+            if self._probing:
+                raise CircuitOpenError(0)
+            self._probing = True
+            return True
+        return False
+
+    def release(self):
+        """试探请求结束但没有结果（被取消、4xx 等）：让下一个请求重新试探。"""
+        self._probing = False
+
+    def record_success(self):
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        self._failures += 1
+        if self.state == "half-open" or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+        self._probing = False
+
+
+class BreakerGroup:
+    """按 key（接口名）各自独立的熔断器，首次用到时创建"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, key: str) -> CircuitBreaker:
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker(
+                self.failure_threshold, self.reset_timeout
+            )
+        return breaker
+
+    def states(self) -> dict:
+        """各接口熔断器的当前状态"""
+        return {key: b.state for key, b in self._breakers.items()}
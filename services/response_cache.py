@@ -0,0 +1,134 @@
+"""
+API 响应缓存
+把 JSON 响应按 "接口 + 参数" 存入本地 SQLite，支持按接口设置 TTL、
+过期后先返回旧数据再后台刷新（stale-while-revalidate），
+以及基于 ETag / Last-Modified 的条件请求。
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import urlencode
+
+from services.storage import data_dir
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """缓存策略（单位：秒）"""
+
+    ttl: float           # 新鲜期内直接返回缓存
+    stale_ttl: float     # 过期后仍可先返回旧数据、后台刷新的时长
+
+
+# 按接口划分的默认策略；未列出的接口不缓存
+DEFAULT_POLICIES = {
+    "works": CachePolicy(ttl=5 * 60, stale_ttl=24 * 3600),
+    "search": CachePolicy(ttl=10 * 60, stale_ttl=24 * 3600),
+    "work": CachePolicy(ttl=24 * 3600, stale_ttl=30 * 24 * 3600),
+    "tracks": CachePolicy(ttl=7 * 24 * 3600, stale_ttl=90 * 24 * 3600),
+}
+
+
+@dataclass
+class CacheEntry:
+    """一条缓存记录"""
+
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+def cache_key(path: str, params: Optional[dict] = None) -> str:
+    """生成缓存键：路径 + 排序后的查询参数。"""
+    if not params:
+        return path
+    return f"{path}?{urlencode(sorted(params.items()))}"
+
+
+class ResponseCache:
+    """基于 SQLite 的响应缓存"""
+
+    def __init__(self, path: Optional[Path] = None, policies: Optional[dict] = None):
+        self.path = path or data_dir() / "responses.db"
+        self.policies = dict(DEFAULT_POLICIES if policies is None else policies)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def policy(self, endpoint: str) -> Optional[CachePolicy]:
+        return self.policies.get(endpoint)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(*row)
+
+    def put(self, key: str, endpoint: str, body: bytes,
+            etag: Optional[str] = None, last_modified: Optional[str] = None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, endpoint, body, etag, last_modified, time.time()),
+            )
+            self._conn.commit()
+
+    def touch(self, key: str):
+        """服务器返回 304 时刷新存储时间。"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            self._conn.commit()
+
+    def purge(self):
+        """删除超出 stale 期限的记录。"""
+        now = time.time()
+        with self._lock:
+            for endpoint, policy in self.policies.items():
+                self._conn.execute(
+                    "DELETE FROM responses WHERE endpoint = ? AND stored_at < ?",
+                    (endpoint, now - policy.ttl - policy.stale_ttl),
+                )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,116 @@
+"""
+本地全文索引
+把 API 返回过的作品写入 SQLite FTS5（trigram 分词，适配中日文子串匹配），
+覆盖标题、社团名和标签名。无网络时也能搜索已知作品。
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+from services.models import Work
+from services.storage import data_dir
+
+# trigram 分词器无法匹配少于 3 个字符的词，这类词改用 LIKE
+_MIN_TRIGRAM = 3
+
+
+class SearchIndex:
+    """作品全文索引"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or data_dir() / "search_index.db"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS works (id INTEGER PRIMARY KEY, data TEXT NOT NULL)"
+        )
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS works_fts USING fts5("
+                "id UNINDEXED, title, circle, tags, tokenize='trigram')"
+            )
+            self.trigram = True
+        except sqlite3.OperationalError:
+            # 旧版 SQLite 没有 trigram，退化为普通表 + LIKE
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS works_fts ("
+                "id INTEGER PRIMARY KEY, title TEXT, circle TEXT, tags TEXT)"
+            )
+            self.trigram = False
+        self._conn.commit()
+
+    # ── 写入 ──────────────────────────────────────────
+
+    def add_works(self, works: Iterable[Work]):
+        """写入或更新一批作品。"""
+        rows = []
+        for w in works:
+            if not w.id:
+                continue
+            tags = " ".join(t.name for t in w.tags)
+            rows.append((w.id, json.dumps(w.to_json(), ensure_ascii=False),
+                         w.title, w.circle.name, tags))
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO works VALUES (?, ?)",
+                [(r[0], r[1]) for r in rows],
+            )
+            self._conn.executemany(
+                "DELETE FROM works_fts WHERE id = ?", [(r[0],) for r in rows]
+            )
+            self._conn.executemany(
+                "INSERT INTO works_fts (id, title, circle, tags) VALUES (?, ?, ?, ?)",
+                [(r[0], r[2], r[3], r[4]) for r in rows],
+            )
+            self._conn.commit()
+
+    # ── 查询 ──────────────────────────────────────────
+
+    def search(self, keyword: str, limit: int = 40) -> list:
+        """按关键词（空格分隔，全部命中）检索本地作品，返回 Work 列表。"""
+        terms = [t for t in keyword.split() if t]
+        if not terms:
+            return []
+
+        long_terms = [t for t in terms if self.trigram and len(t) >= _MIN_TRIGRAM]
+        short_terms = [t for t in terms if t not in long_terms]
+
+        where, args = [], []
+        if long_terms:
+            where.append("works_fts MATCH ?")
+            args.append(" AND ".join('"' + t.replace('"', '""') + '"' for t in long_terms))
+        for t in short_terms:
+            where.append("(f.title LIKE ? OR f.circle LIKE ? OR f.tags LIKE ?)")
+            pattern = f"%{t}%"
+            args.extend([pattern, pattern, pattern])
+        order = "ORDER BY rank" if long_terms else "ORDER BY f.id DESC"
+        sql = (
+            "SELECT w.data FROM works_fts f JOIN works w ON w.id = f.id "
+            f"WHERE {' AND '.join(where)} {order} LIMIT ?"
+        )
+        args.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [Work.from_json(json.loads(r[0])) for r in rows]
+
+    def get(self, work_id: int) -> Optional[Work]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM works WHERE id = ?", (work_id,)
+            ).fetchone()
+        return Work.from_json(json.loads(row[0])) if row else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM works").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,62 @@
+"""
+请求合并（single-flight）
+同一个键的并发请求只真正执行一次，结果共享给所有等待者。
+某个等待者取消不会影响其他人；所有等待者都取消后才取消底层任务。
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """进行中请求登记表"""
+
+    def __init__(self):
+        self._flights: dict[Hashable, _Flight] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._flights
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        执行 factory() 并返回结果；若相同 key 的请求正在进行，则等待它的结果。
+
+        注意：所有等待者拿到的是同一个结果对象，调用方不应原地修改。
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(factory()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            # 最后一个等待者离开时才取消真正的请求
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+                self._forget(key, flight)
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def cancel_all(self):
+        for flight in self._flights.values():
+            flight.task.cancel()
+        self._flights.clear()
@@ -0,0 +1,28 @@
+"""
+界面快照
+把某个界面最近一次的数据存成小 JSON 文件，下次启动时不等网络先渲染出来。
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+
+class Snapshot:
+    """单个 JSON 快照文件（原子写入）"""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def load(self) -> Optional[dict]:
+        """读取快照，不存在或损坏时返回 None。"""
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def save(self, data: dict):
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
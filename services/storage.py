@@ -0,0 +1,28 @@
+"""
+本地存储路径
+统一管理缓存、数据库等文件的存放位置。
+
+Android 打包后 Flet 会通过环境变量提供应用私有目录；
+桌面端回退到用户主目录下的 .asmr_player。
+"""
+
+import os
+from pathlib import Path
+
+_FALLBACK_ROOT = Path.home() / ".asmr_player"
+
+
+def data_dir() -> Path:
+    """持久数据目录（数据库、索引等）。"""
+    root = os.environ.get("FLET_APP_STORAGE_DATA")
+    path = Path(root) if root else _FALLBACK_ROOT / "data"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def cache_dir() -> Path:
+    """可清理的缓存目录（图片、音频等）。"""
+    root = os.environ.get("FLET_APP_STORAGE_TEMP")
+    path = Path(root) if root else _FALLBACK_ROOT / "cache"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
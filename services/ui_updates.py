@@ -0,0 +1,131 @@
+"""
+界面刷新调度
+控件改动后只标记为待刷新，由后台循环按限定帧率合并成一次 page.update(...) 发出，
+避免播放进度、悬停等高频事件每次都单独走一遍 Flet 协议。
+应用切到后台（Android）时进一步降低刷新率，减少耗电。
+
+Flet 默认在每个事件处理函数结束后自动刷新整页（auto-update），
+request_update 会关掉当前这次事件的自动刷新，改由调度器统一发出。
+每个页面（会话）各有一个调度器，控件按所在页面找到自己的调度器。
+"""
+
+import asyncio
+import time
+
+import flet as ft
+
+# 应用切到这些状态时视为后台
+_BACKGROUND_STATES = (
+    ft.AppLifecycleState.HIDE,
+    ft.AppLifecycleState.PAUSE,
+    ft.AppLifecycleState.DETACH,
+)
+
+# id(page) -> 该页面的调度器（多会话应用里每个会话一个）
+_schedulers: dict[int, "UpdateScheduler"] = {}
+
+
+def request_update(control: ft.Control):
+    """标记控件需要刷新。所在页面没有运行中的调度器时立即刷新。"""
+    try:
+        page = control.page
+    except RuntimeError:
+        page = None
+    if page is None:
+        # 还没挂到页面上：挂载时会带上最新状态
+        return
+    scheduler = _schedulers.get(id(page))
+    if scheduler is not None and scheduler.running:
+        scheduler.mark(control)
+        # 本次事件结束后不再整页自动刷新，只由调度器发出。
+        # 先 reset 出当前上下文自己的状态，避免改到父上下文（共享的默认值）
+        ft.context.reset_auto_update()
+        ft.context.disable_auto_update()
+    else:
+        control.update()
+
+
+class UpdateScheduler:
+    """合并控件刷新，按帧率上限批量发出"""
+
+    def __init__(self, page: ft.Page, fps: float = 20, background_fps: float = 1,
+                 metrics=None):
+        """
+        参数:
+            page: 所属页面
+            fps: 前台时每秒最多刷新次数
+            background_fps: 后台时每秒最多刷新次数
+            metrics: 可选的 Metrics，记录每批刷新的耗时（ui_flush）
+        """
+        self.page = page
+        self.metrics = metrics
+        self.fps = fps
+        self.background_fps = background_fps
+        self.background = False
+        self._dirty: dict[int, ft.Control] = {}
+        self._wake = asyncio.Event()
+        self._job = None
+        self._on_lifecycle_prev = None
+
+    # ── 生命周期 ──────────────────────────────────────
+
+    def start(self) -> "UpdateScheduler":
+        """启动刷新循环并登记为所属页面的调度器。"""
+        _schedulers[id(self.page)] = self
+        self._job = self.page.run_task(self._run)
+        self._on_lifecycle_prev = self.page.on_app_lifecycle_state_change
+        self.page.on_app_lifecycle_state_change = self._on_lifecycle
+        return self
+
+    def stop(self):
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
+        if _schedulers.get(id(self.page)) is self:
+            del _schedulers[id(self.page)]
+
+    @property
+    def running(self) -> bool:
+        return self._job is not None and not self._job.done()
+
+    # ── 刷新 ──────────────────────────────────────────
+
+    def mark(self, control: ft.Control):
+        self._dirty[id(control)] = control
+        self._wake.set()
+
+    def flush(self):
+        """立即发出所有待刷新的控件（已从页面移除的跳过）。"""
+        controls = list(self._dirty.values())
+        self._dirty.clear()
+        mounted = []
+        for control in controls:
+            try:
+                if control.page is not None:
+                    mounted.append(control)
+            except RuntimeError:
+                pass
+        if mounted:
+            started = time.perf_counter()
+            try:
+                self.page.update(*mounted)
+            except Exception as e:
+                print(f"UI update failed: {e}")
+            if self.metrics is not None:
+                self.metrics.observe("ui_flush", time.perf_counter() - started)
+
+    async def _run(self):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            self.flush()
+            # 间隔内的刷新请求合并到下一批
+            await asyncio.sleep(1 / (self.background_fps if self.background else self.fps))
+
+    def _on_lifecycle(self, e):
+        if e.state in _BACKGROUND_STATES:
+            self.background = True
+        elif e.state in (ft.AppLifecycleState.SHOW, ft.AppLifecycleState.RESUME):
+            self.background = False
+        if self._on_lifecycle_prev:
+            self._on_lifecycle_prev(e)
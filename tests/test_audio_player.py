@@ -0,0 +1,58 @@
+import flet as ft
+import flet_audio as fta
+
+from components.audio_player import AudioPlayer
+from services.models import Track
+from services.play_queue import PlayQueue, build_queue
+
+
+class FakePage:
+    def __init__(self):
+        self.tasks = []
+
+    def run_task(self, handler, *args):
+        self.tasks.append((handler, args))
+
+    def update(self, *controls):
+        pass
+
+
+def _player_with_queue():
+    tracks = [Track("audio", f"{i}.mp3", stream_url=f"http://x/{i}.mp3") for i in range(3)]
+    player = AudioPlayer()
+    player._invoke = lambda method, *args: None
+    player._page = FakePage()
+    player.audio = fta.Audio(src="http://x/0.mp3")
+    player._standby = fta.Audio(src="")
+    player._queue = PlayQueue(build_queue(tracks))
+    player._prepare_next(player._page)
+    return player
+
+
+def test_completed_state_advances_to_standby():
+    player = _player_with_queue()
+    first, standby = player.audio, player._standby
+
+    player._on_state_change(
+        fta.AudioStateChangeEvent("state_change", first, fta.AudioState.COMPLETED)
+    )
+
+    assert player.audio is standby
+    assert player._standby is first
+    assert player._queue.index == 1
+    assert player.title_text.value == "1.mp3"
+    assert player._standby.src == "http://x/2.mp3"
+
+
+def test_standby_duration_carries_over():
+    player = _player_with_queue()
+    player._on_duration_change(
+        fta.AudioDurationChangeEvent("duration_change", player._standby, ft.Duration(seconds=90))
+    )
+    assert player.duration_ms == 0
+
+    player._on_state_change(
+        fta.AudioStateChangeEvent("state_change", player.audio, fta.AudioState.COMPLETED)
+    )
+    assert player.duration_ms == 90_000
+    assert player.time_text.value == "0:00 / 1:30"